@@ -1,329 +1,1753 @@
-from flask import Flask, jsonify, request, render_template_string, send_from_directory
-from flask_cors import CORS
-import requests
-from bs4 import BeautifulSoup
-import re
-import threading
-import time
-from datetime import datetime, timedelta
-import os
-import sys
-
-app = Flask(__name__)
-# CORRECTED CORS CONFIGURATION
-# Using a wildcard for onrender.com makes it more robust for deployment.
-cors_config = {
-    "origins": [
-        "http://localhost:*",
-        "http://127.0.0.1:*",
-        "https://*.onrender.com", # More reliable wildcard for Render deployments
-        "https://*.vercel.app",
-        "https://*.netlify.app",
-        "https://gajju-trial2.pages.dev/",
-        "file://",
-    ],
-    "methods": ["GET", "POST", "OPTIONS"],
-    "allow_headers": [
-        "Content-Type",
-        "Authorization",
-        "Access-Control-Allow-Credentials",
-        "Access-Control-Allow-Origin",
-        "Accept"
-    ],
-    "supports_credentials": True,
-    "max_age": 3600
-}
-
-# Apply CORS with specific configuration
-CORS(app, resources={
-    r"/api/*": cors_config,
-    r"/": cors_config,
-    r"/live": cors_config
-})
-
-# REMOVED @app.after_request handler.
-# This function was redundant and likely causing a conflict with the flask-cors extension,
-# especially in a deployed environment. The CORS() setup above is the correct way to handle this.
-
-# Global variables
-CURRENT_MATCH_URL = None
-MATCH_DATA = {}
-AUTO_UPDATE = True
-UPDATE_INTERVAL = 15  # seconds
-
-class Colors:
-    """Terminal colors"""
-    HEADER = '\033[95m'
-    BLUE = '\033[94m'
-    CYAN = '\033[96m'
-    GREEN = '\033[92m'
-    WARNING = '\033[93m'
-    FAIL = '\033[91m'
-    ENDC = '\033[0m'
-    BOLD = '\033[1m'
-    UNDERLINE = '\033[4m'
-
-class CricketScraper:
-    def __init__(self):
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        }
-        
-    def scrape_crex_scores(self, match_url):
-        """Scrape live scores from CREX"""
-        try:
-            response = requests.get(match_url, headers=self.headers, timeout=10)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            title_elem = soup.find('title')
-            title_text = title_elem.text.strip() if title_elem else ""
-            
-            data = self.parse_title_data(title_text)
-            data['timestamp'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            return data
-            
-        except Exception as e:
-            print(f"{Colors.FAIL}Error scraping: {str(e)}{Colors.ENDC}")
-            return None
-
-    def parse_title_data(self, title_text):
-        """Parse the title text to extract match information and state"""
-        data = {
-            'matchState': 'UNKNOWN', 'title': title_text, 'shortTitle': '',
-            'result': '', 'startTimeUTC': None, 'update': 'Live',
-            'livescore': title_text.split(' | ')[0], 'runrate': 'CRR: 0.00',
-            'team1_name': 'Team 1', 'team1_score': '0', 'team1_wickets': '0', 'team1_overs': '0.0',
-            'team2_name': 'Team 2', 'team2_score': '0', 'team2_wickets': '0', 'team2_overs': '0.0',
-            'team2_status': 'Yet to bat',
-            'batterone': 'Batsman 1', 'batsmanonerun': '0', 'batsmanoneball': '(0)', 'batsmanonesr': '0.00',
-            'battertwo': 'Batsman 2', 'batsmantworun': '0', 'batsmantwoball': '(0)', 'batsmantwosr': '0.00'
-        }
-        
-        score_part = title_text.split(' | ')[0]
-
-        if "won by" in score_part.lower() or "beat" in score_part.lower() or "match drawn" in score_part.lower():
-            data['matchState'] = 'ENDED'
-            data['result'] = score_part
-            try:
-                teams_part = title_text.split(' | ')[1]
-                vs_match = re.search(r'(.+?)\s+vs\s+(.+?),', teams_part)
-                if vs_match:
-                    data['team1_name'], data['team2_name'] = vs_match.group(1).strip(), vs_match.group(2).strip()
-                    data['shortTitle'] = f"{data['team1_name']} vs {data['team2_name']}"
-            except Exception: pass
-            return data
-
-        if "starts at" in score_part.lower() or re.search(r'in\s+\d+', score_part.lower()):
-            data['matchState'] = 'UPCOMING'
-            try:
-                teams_part = score_part.split(',')[0]
-                vs_match = re.search(r'(.+?)\s+vs\s+(.+)', teams_part)
-                if vs_match:
-                    data['team1_name'], data['team2_name'] = vs_match.group(1).strip(), vs_match.group(2).strip()
-                    data['shortTitle'] = f"{data['team1_name']} vs {data['team2_name']}"
-                time_match = re.search(r'in\s+(?:(\d+)h\s*)?(?:(\d+)m)?', score_part)
-                if time_match:
-                    hours, minutes = int(time_match.group(1) or 0), int(time_match.group(2) or 0)
-                    start_time = datetime.utcnow() + timedelta(hours=hours, minutes=minutes)
-                    data['startTimeUTC'] = start_time.isoformat() + "Z"
-            except Exception as e:
-                print(f"Error parsing upcoming match time: {e}")
-            return data
-            
-        data['matchState'] = 'LIVE'
-        try:
-            if ' vs ' in score_part:
-                vs_index = score_part.find(' vs ')
-                team1_full, team2_full = score_part[:vs_index].strip(), score_part[vs_index + 4:].strip()
-                
-                team1_name_match = re.match(r'^([^\d]+)', team1_full)
-                if team1_name_match: data['team1_name'] = team1_name_match.group(1).strip()
-                
-                team2_name_match = re.match(r'^([^\d]+)', team2_full)
-                if team2_name_match: data['team2_name'] = team2_name_match.group(1).strip()
-
-                if team1_name_match and team2_name_match:
-                    data['shortTitle'] = f"{data['team1_name']} vs {data['team2_name']}"
-
-                score_match = re.search(r'(\d+)-(\d+)', team1_full)
-                if score_match: data['team1_score'], data['team1_wickets'] = score_match.groups()
-                
-                overs_match = re.search(r'\((\d+\.\d+)\)', team1_full)
-                if overs_match: data['team1_overs'] = overs_match.group(1)
-                
-                score_overs_match = re.search(r'\d+-\d+\s+\(\d+\.\d+\)', team1_full)
-                if score_overs_match:
-                    batsmen_part = team1_full[score_overs_match.end():].strip()
-                    if batsmen_part.startswith('(') and batsmen_part.endswith(')'):
-                        batsmen_str = batsmen_part[1:-1]
-                        batsmen_list = [b.strip() for b in batsmen_str.split(',')]
-                        for i, info in enumerate(batsmen_list[:2]):
-                            bat_match = re.match(r'^(.+?)\s+(\d+)\((\d+)\)$', info.strip())
-                            if bat_match:
-                                name, runs, balls = bat_match.groups()
-                                sr = f"{(int(runs) * 100 / int(balls)):.2f}" if int(balls) > 0 else "0.00"
-                                if i == 0:
-                                    data.update({'batterone': name.strip(), 'batsmanonerun': runs, 'batsmanoneball': f"({balls})", 'batsmanonesr': sr})
-                                else:
-                                    data.update({'battertwo': name.strip(), 'batsmantworun': runs, 'batsmantwoball': f"({balls})", 'batsmantwosr': sr})
-                
-                score_match_t2 = re.search(r'(\d+)-(\d+)', team2_full)
-                if score_match_t2: data['team2_score'], data['team2_wickets'] = score_match_t2.groups()
-                
-                overs_match_t2 = re.search(r'\(\(?(\d+(?:\.\d+)?)\)?\)', team2_full)
-                if overs_match_t2: data['team2_overs'] = overs_match_t2.group(1)
-                
-                if data['team2_score'] != '0':
-                    data['team2_status'] = f"{data['team2_score']}-{data['team2_wickets']} ({data['team2_overs']} overs)"
-                
-                try:
-                    t1_runs, t1_overs_dec = int(data['team1_score']), self.overs_to_decimal(data['team1_overs'])
-                    if t1_overs_dec > 0:
-                        data['runrate'] = f'CRR: {round(t1_runs / t1_overs_dec, 2)}'
-                        t2_runs = int(data['team2_score'])
-                        if t2_runs > 0:
-                            target = t2_runs + 1
-                            runs_needed = target - t1_runs
-                            overs_left_dec = self.overs_to_decimal(data['team2_overs']) - t1_overs_dec
-                            if overs_left_dec > 0 and runs_needed > 0:
-                                data['runrate'] += f' | RRR: {round(runs_needed / overs_left_dec, 2)}'
-                            data['update'] = f"Target: {target}"
-                except (ValueError, ZeroDivisionError): pass
-        except Exception as e:
-            print(f"Error parsing live title: {str(e)}")
-        return data
-    
-    def overs_to_decimal(self, overs):
-        try:
-            if '.' in overs:
-                parts = overs.split('.')
-                return int(parts[0]) + (int(parts[1]) / 6)
-            return float(overs)
-        except:
-            return 0.0
-
-URL_INPUT_PAGE = """
-<!DOCTYPE html><html><head><title>Cricket Score Tracker - Control Panel</title><style>*{margin:0;padding:0;box-sizing:border-box}body{font-family:'Segoe UI',sans-serif;background:linear-gradient(135deg,#0f0c29 0%,#302b63 50%,#24243e 100%);color:white;min-height:100vh;padding:20px}.container{max-width:800px;margin:0 auto}.card{background:rgba(255,255,255,0.1);padding:30px;border-radius:20px;backdrop-filter:blur(10px);margin-bottom:20px;box-shadow:0 8px 32px 0 rgba(31,38,135,0.37)}h1{margin-bottom:30px;text-align:center;font-size:2.5rem}h2{margin-bottom:20px;color:#667eea}input{width:100%;padding:15px;font-size:16px;border:none;border-radius:10px;background:rgba(255,255,255,0.2);color:white;margin-bottom:20px}input::placeholder{color:rgba(255,255,255,0.7)}button{background:linear-gradient(135deg,#667eea 0%,#764ba2 100%);color:white;border:none;padding:12px 30px;font-size:16px;border-radius:50px;cursor:pointer;transition:all .3s ease;margin-right:10px}button:hover{transform:translateY(-2px);box-shadow:0 5px 20px rgba(0,0,0,0.3)}.status{padding:15px;border-radius:10px;margin-top:20px}.success{background:rgba(46,204,113,0.2);color:#2ecc71}.error{background:rgba(231,76,60,0.2);color:#e74c3c}.info{background:rgba(52,152,219,0.2);color:#3498db}.current-match{display:grid;grid-template-columns:1fr 1fr;gap:20px;margin-top:20px}.stat-box{background:rgba(255,255,255,0.05);padding:20px;border-radius:10px;text-align:center}.stat-label{font-size:.9rem;opacity:.8;margin-bottom:5px}.stat-value{font-size:1.5rem;font-weight:bold;color:#ffd93d}.endpoints{background:rgba(255,255,255,0.05);padding:20px;border-radius:10px;margin-top:20px}.endpoint{padding:10px;margin:5px 0;background:rgba(255,255,255,0.05);border-radius:5px;font-family:monospace}.live-indicator{display:inline-block;width:10px;height:10px;background:#2ecc71;border-radius:50%;animation:pulse 2s infinite;margin-right:10px}@keyframes pulse{0%{box-shadow:0 0 0 0 rgba(46,204,113,0.7)}70%{box-shadow:0 0 0 10px rgba(46,204,113,0)}100%{box-shadow:0 0 0 0 rgba(46,204,113,0)}}</style></head><body><div class=container><div class=card><h1>🏏 Cricket Score Tracker</h1><form onsubmit=setURL(event)><input type=url id=matchUrl placeholder=... required value="{{ current_url or '' }}"><div><button type=submit>Start Tracking</button><button type=button onclick=refreshScores()>🔄 Refresh Now</button><button type=button onclick=toggleAutoUpdate()><span id=autoUpdateBtn>{{ '⏸️ Pause' if auto_update else '▶️ Resume' }} Auto-Update</span></button><button type=button onclick="window.location.href='/live'">📺 View Live Scores</button></div></form><div id=status></div></div>{% if current_url and match_data %}<div class=card><h2><span class=live-indicator></span>Current Match</h2><div class=current-match><div class=stat-box><div class=stat-label>{{ match_data.get('team1_name', 'Team 1') }}</div><div class=stat-value>{{ match_data.get('team1_score', '0') }}-{{ match_data.get('team1_wickets', '0') }}</div><div style=opacity:.8>({{ match_data.get('team1_overs', '0') }} overs)</div></div><div class=stat-box><div class=stat-label>{{ match_data.get('team2_name', 'Team 2') }}</div>{% if match_data.get('team2_status', 'Yet to bat') != 'Yet to bat' %}<div class=stat-value>{{ match_data.get('team2_score', '0') }}-{{ match_data.get('team2_wickets', '0') }}</div><div style=opacity:.8>({{ match_data.get('team2_overs', '0') }} overs)</div>{% else %}<div class=stat-value>Yet to bat</div>{% endif %}</div><div class=stat-box><div class=stat-label>Run Rate</div><div class=stat-value>{{ match_data.get('runrate', 'CRR: 0.00') }}</div></div><div class=stat-box><div class=stat-label>Last Update</div><div class=stat-value>{{ match_data.get('timestamp', 'N/A') }}</div></div></div>{% if match_data.get('batterone', 'Batsman 1') != 'Batsman 1' %}<div class=stat-box style=margin-top:20px><h3 style=margin-bottom:15px>Current Batsmen</h3><p>🏏 {{ match_data.get('batterone') }}: {{ match_data.get('batsmanonerun') }} {{ match_data.get('batsmanoneball') }} SR: {{ match_data.get('batsmanonesr') }}</p>{% if match_data.get('battertwo', 'Batsman 2') != 'Batsman 2' %}<p>🏏 {{ match_data.get('battertwo') }}: {{ match_data.get('batsmantworun') }} {{ match_data.get('batsmantwoball') }} SR: {{ match_data.get('batsmantwosr') }}</p>{% endif %}</div>{% endif %}</div>{% endif %}<div class=card><h2>API Endpoints</h2><div class=endpoints><div class=endpoint>GET /api/current-score - Get current match scores</div><div class=endpoint>GET /api/scrape?url={match_url} - Scrape specific match</div><div class=endpoint>POST /api/set-url - Set new match URL</div></div></div></div><script>let autoUpdate={{ 'true' if auto_update else 'false' }};async function setURL(e){e.preventDefault();const t=document.getElementById("matchUrl").value,s=document.getElementById("status");s.innerHTML="⏳ Setting up tracking...",s.className="status info";try{const e=await fetch("/api/set-url",{method:"POST",headers:{"Content-Type":"application/json"},body:JSON.stringify({url:t})}),a=await e.json();e.ok?(s.innerHTML="✅ Tracking started successfully!",s.className="status success",setTimeout(()=>window.location.reload(),1500)):(s.innerHTML="❌ "+(a.error||"Failed to set URL"),s.className="status error")}catch(e){s.innerHTML="❌ Error: "+e.message,s.className="status error"}}async function refreshScores(){const e=document.getElementById("status");e.innerHTML="🔄 Refreshing scores...",e.className="status info";try{const t=await fetch("/api/scrape");await t.json();t.ok?(e.innerHTML="✅ Scores refreshed!",e.className="status success",setTimeout(()=>window.location.reload(),1e3)):(e.innerHTML="❌ Failed to refresh scores",e.className="status error")}catch(t){e.innerHTML="❌ Error: "+t.message,e.className="status error"}}async function toggleAutoUpdate(){autoUpdate=!autoUpdate;const e=document.getElementById("autoUpdateBtn");e.textContent=autoUpdate?"⏸️ Pause Auto-Update":"▶️ Resume Auto-Update";try{await fetch("/api/toggle-auto-update",{method:"POST"})}catch(e){console.error("Failed to toggle auto-update:",e)}}autoUpdate&&setInterval(()=>{window.location.reload()},3e4)</script></body></html>
-"""
-
-scraper = CricketScraper()
-
-@app.route('/')
-def home():
-    return render_template_string(URL_INPUT_PAGE, current_url=CURRENT_MATCH_URL, match_data=MATCH_DATA, auto_update=AUTO_UPDATE)
-
-@app.route('/live')
-def live_scores():
-    if os.path.exists('index.html'):
-        return send_from_directory('.', 'index.html')
-    return "<h3>index.html not found!</h3>"
-
-@app.route('/api/set-url', methods=['POST'])
-def set_url():
-    global CURRENT_MATCH_URL, MATCH_DATA
-    url = request.json.get('url')
-    if not url: return jsonify({"error": "URL is required"}), 400
-    CURRENT_MATCH_URL = url
-    scraped_data = scraper.scrape_crex_scores(url)
-    if scraped_data:
-        MATCH_DATA = scraped_data
-        print_match_update(scraped_data)
-        return jsonify({"message": "URL set successfully", "initial_data": scraped_data})
-    return jsonify({"error": "Failed to scrape initial data"}), 500
-
-@app.route('/api/current-score')
-def get_current_score():
-    headers = {'Cache-Control': 'no-cache, no-store, must-revalidate', 'Pragma': 'no-cache', 'Expires': '0'}
-    if not CURRENT_MATCH_URL:
-        return jsonify({"error": "No match URL set."}), 400, headers
-    
-    # Always fetch latest for this endpoint to ensure freshness
-    data = scraper.scrape_crex_scores(CURRENT_MATCH_URL)
-    if data:
-        MATCH_DATA.update(data) # Update global state
-        return jsonify(MATCH_DATA), 200, headers
-    
-    # Fallback to stored data if fetch fails
-    if MATCH_DATA:
-        return jsonify(MATCH_DATA), 200, headers
-        
-    return jsonify({"error": "No data available yet."}), 503, headers
-
-@app.route('/api/scrape')
-def scrape_match():
-    global CURRENT_MATCH_URL, MATCH_DATA
-    match_url = request.args.get('url') or CURRENT_MATCH_URL
-    if not match_url: return jsonify({"error": "No match URL provided or set"}), 400
-    data = scraper.scrape_crex_scores(match_url)
-    if data:
-        MATCH_DATA = data
-        print_match_update(data)
-        return jsonify(data)
-    return jsonify({"error": "Unable to scrape match data"}), 500
-
-def print_banner():
-    os.system('cls' if os.name == 'nt' else 'clear')
-    print(f"{Colors.CYAN}╔═══════════════════════════════════════════════════════════╗\n"
-          f"║         {Colors.BOLD}🏏  CRICKET SCORE TRACKER - CREX SCRAPER  🏏{Colors.ENDC}{Colors.CYAN}         ║\n"
-          f"╚═══════════════════════════════════════════════════════════╝{Colors.ENDC}")
-
-def print_match_update(data):
-    print(f"\n{Colors.GREEN}━━━ Match Update at {data.get('timestamp', '')} ━━━{Colors.ENDC}")
-    print(f"{Colors.BOLD}Score:{Colors.ENDC} {data.get('livescore', 'N/A')}")
-    if data.get('batterone', 'Batsman 1') != 'Batsman 1':
-        print(f"\n{Colors.CYAN}At the Crease:{Colors.ENDC}")
-        print(f"  • {data.get('batterone')}: {data.get('batsmanonerun')}{data.get('batsmanoneball')} SR: {data.get('batsmanonesr')}")
-        if data.get('battertwo', 'Batsman 2') != 'Batsman 2':
-            print(f"  • {data.get('battertwo')}: {data.get('batsmantworun')}{data.get('batsmantwoball')} SR: {data.get('batsmantwosr')}")
-    print(f"{Colors.GREEN}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Colors.ENDC}\n")
-
-def auto_update_scores():
-    while True:
-        if AUTO_UPDATE and CURRENT_MATCH_URL:
-            print(f"{Colors.CYAN}[Auto-Update] Fetching latest scores...{Colors.ENDC}")
-            data = scraper.scrape_crex_scores(CURRENT_MATCH_URL)
-            if data:
-                MATCH_DATA = data
-                print_match_update(data)
-            else:
-                print(f"{Colors.FAIL}[Auto-Update] Failed to fetch scores{Colors.ENDC}")
-        time.sleep(UPDATE_INTERVAL)
-
-def get_user_input():
-    global CURRENT_MATCH_URL, MATCH_DATA
-    print_banner()
-    url = ""
-    if len(sys.argv) > 1:
-        url = sys.argv[1]
-        print(f"\n{Colors.GREEN}✅ URL provided via command line.{Colors.ENDC}")
-    else:
-        url = input(f"\n{Colors.CYAN}Enter CREX match URL (or press Enter to set via web): {Colors.ENDC}").strip()
-    
-    if url:
-        CURRENT_MATCH_URL = url
-        print(f"{Colors.CYAN}📊 Fetching initial scores...{Colors.ENDC}")
-        data = scraper.scrape_crex_scores(CURRENT_MATCH_URL)
-        if data: MATCH_DATA = data; print_match_update(data)
-    else:
-        print(f"\n{Colors.CYAN}📌 No URL provided. Set it via the web interface.{Colors.ENDC}")
-    print_server_info()
-
-def print_server_info():
-    print(f"\n{Colors.GREEN}{'='*60}{Colors.ENDC}")
-    print(f"{Colors.BOLD}🌐 Server is live at: http://localhost:5000{Colors.ENDC}")
-    print(f"  • View scoreboard at: {Colors.CYAN}http://localhost:5000/live{Colors.ENDC}")
-    if CURRENT_MATCH_URL: print(f"  • Tracking: {Colors.GREEN}{CURRENT_MATCH_URL}{Colors.ENDC}")
-    print(f"{Colors.GREEN}{'='*60}{Colors.ENDC}\n")
-
-if __name__ == '__main__':
-    try:
-        update_thread = threading.Thread(target=auto_update_scores, daemon=True)
-        update_thread.start()
-        get_user_input()
-        port = int(os.environ.get('PORT', 5000))
-        app.run(debug=False, host='0.0.0.0', port=port, use_reloader=False)
-    except KeyboardInterrupt:
-        print(f"\n\n{Colors.CYAN}Server stopped. Goodbye! 👋{Colors.ENDC}")
-        sys.exit(0)
+from flask import Flask, Response, jsonify, request, stream_with_context
+from flask_cors import CORS
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+import re
+import bisect
+import gzip
+import html
+import sqlite3
+import hashlib
+import json
+import queue
+import random
+import threading
+import zlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+import os
+import sys
+
+try:
+    import brotli
+except ImportError:  # optional: gzip is always available
+    brotli = None
+
+app = Flask(__name__)
+# CORRECTED CORS CONFIGURATION
+# Using a wildcard for onrender.com makes it more robust for deployment.
+cors_config = {
+    "origins": [
+        "http://localhost:*",
+        "http://127.0.0.1:*",
+        "https://*.onrender.com", # More reliable wildcard for Render deployments
+        "https://*.vercel.app",
+        "https://*.netlify.app",
+        "https://gajju-trial2.pages.dev/",
+        "file://",
+    ],
+    "methods": ["GET", "POST", "OPTIONS"],
+    "allow_headers": [
+        "Content-Type",
+        "Authorization",
+        "Access-Control-Allow-Credentials",
+        "Access-Control-Allow-Origin",
+        "Accept"
+    ],
+    "supports_credentials": True,
+    "max_age": 3600
+}
+
+# Apply CORS with specific configuration
+CORS(app, resources={
+    r"/api/*": cors_config,
+    r"/": cors_config,
+    r"/live": cors_config
+})
+
+# REMOVED @app.after_request handler.
+# This function was redundant and likely causing a conflict with the flask-cors extension,
+# especially in a deployed environment. The CORS() setup above is the correct way to handle this.
+
+# Global variables
+AUTO_UPDATE = True
+UPDATE_INTERVAL = 15  # seconds
+UPCOMING_LEAD_TIME = 10 * 60  # seconds before startTimeUTC to start polling an upcoming match
+LIVE_MIN_INTERVAL = 5  # fastest a live match is polled while nearly every poll brings a new ball
+BREAK_AFTER_POLLS = 4  # unchanged polls in a row before a live match is treated as being in a break
+MAX_POLL_INTERVAL = 120  # slowest a live match is polled during long breaks or repeated failures
+CHANGE_RATE_WEIGHT = 0.3  # weight of the newest poll in the moving average of "did the title change"
+HOST_RATE = 10.0  # sustained requests per second to one upstream host; 50 live matches at LIVE_MIN_INTERVAL
+HOST_BURST = 60  # requests a host's budget can save up, enough to poll 50+ matches due in the same tick
+DEFAULT_RETRY_AFTER = 60  # seconds to back off after a 429 without a usable Retry-After
+SCHEDULER_TICK = 1  # seconds between checks for matches that are due
+FETCH_WORKERS = 16  # matches refreshed in parallel by the updater
+PER_HOST_CONCURRENCY = 4  # simultaneous requests to any one upstream host
+FETCH_TIMEOUT = (3.05, 10)  # connect and read timeouts in seconds
+FETCH_RETRIES = 2  # extra attempts after a connection error, timeout or 5xx
+RETRY_BACKOFF = 0.5  # base seconds for exponential backoff between attempts
+STREAM_CHUNK_SIZE = 8192  # bytes read per step while looking for </title>
+STREAM_MAX_BYTES = 512 * 1024  # give up on the fast path if </title> hasn't shown up by here
+STREAM_DRAIN_LIMIT = 32 * 1024  # finish reading a body this close to done so its connection can be reused
+
+def next_version(previous=None):
+    """Snapshot version: wall-clock milliseconds, bumped past the previous version.
+
+    Versions keep increasing across restarts and across worker processes on
+    one host, so a client's ETag never matches different data.
+    """
+    return max(int(time.time() * 1000), (previous or 0) + 1)
+
+# Title parser patterns, compiled once. The tokenizers walk one side of a live
+# score ("IND 245-3 (40.2) (Kohli 80(70), Rahul 30(25))") left to right; the
+# trailing single-digit alternative only exists to mark where the team name ends.
+ENDED_TEAMS_RE = re.compile(r'(.+?)\s+vs\s+(.+?),')
+UPCOMING_TEAMS_RE = re.compile(r'(.+?)\s+vs\s+(.+)')
+STARTS_IN_RE = re.compile(r'in\s+\d+')
+START_DELAY_RE = re.compile(r'in\s+(?:(\d+)h\s*)?(?:(\d+)m)?')
+BATSMAN_RE = re.compile(r'^(.+?)\s+(\d+)\((\d+)\)$')
+BATTING_TOKEN_RE = re.compile(
+    r'(?P<score>(?P<runs>\d+)-(?P<wkts>\d+)(?:\s+\((?P<att_overs>\d+\.\d+)\))?)'
+    r'|\((?P<overs>\d+\.\d+)\)'
+    r'|(?P<digit>\d)')
+BATTING_OVERS_RE = re.compile(r'\(\d+\.\d+\)')  # the overs token BATTING_TOKEN_RE reads; batters' 80(70) has no dot
+OVER_PARAM_RE = re.compile(r'^\d+(?:\.[0-5])?$')  # from_over / to_over on the history API
+BOWLING_TOKEN_RE = re.compile(
+    r'(?P<score>(?P<runs>\d+)-(?P<wkts>\d+))'
+    r'|\(\(?(?P<overs>\d+(?:\.\d+)?)\)?\)'
+    r'|(?P<digit>\d)')
+
+EMPTY_SNAPSHOT = {
+    'matchState': 'UNKNOWN', 'title': '', 'shortTitle': '',
+    'result': '', 'startTimeUTC': None, 'update': 'Live',
+    'livescore': '', 'runrate': 'CRR: 0.00',
+    'team1_name': 'Team 1', 'team1_score': '0', 'team1_wickets': '0', 'team1_overs': '0.0',
+    'team2_name': 'Team 2', 'team2_score': '0', 'team2_wickets': '0', 'team2_overs': '0.0',
+    'team2_status': 'Yet to bat',
+    'batterone': 'Batsman 1', 'batsmanonerun': '0', 'batsmanoneball': '(0)', 'batsmanonesr': '0.00',
+    'battertwo': 'Batsman 2', 'batsmantworun': '0', 'batsmantwoball': '(0)', 'batsmantwosr': '0.00'
+}
+
+TITLE_END_RE = re.compile(rb'</title\s*>', re.IGNORECASE)
+TITLE_RE = re.compile(rb'<title(?:\s[^>]*)?>(.*?)</title\s*>', re.IGNORECASE | re.DOTALL)
+CACHE_TTL = 10  # seconds a snapshot is served before it is refreshed upstream
+CACHE_MAX_STALE = 60  # seconds a stale snapshot may still be served while a refresh is in flight
+CACHE_WAIT_TIMEOUT = 15  # seconds a request waits on an in-flight refresh with no usable snapshot
+STREAM_KEEPALIVE = 15  # seconds between SSE comment pings on an idle stream
+STREAM_RETRY_MS = 5000  # reconnect delay suggested to EventSource clients
+# Shared mode (e.g. several gunicorn workers): set SNAPSHOT_STORE to a SQLite file path.
+# One process per host wins POLLER_LOCK and scrapes; the rest serve what it stores.
+SNAPSHOT_STORE = os.environ.get('SNAPSHOT_STORE')
+POLLER_LOCK = os.environ.get('POLLER_LOCK') or (SNAPSHOT_STORE and SNAPSHOT_STORE + '.lock')
+STORE_READ_TTL = 1  # seconds a non-polling worker serves a snapshot before re-reading the store
+REGISTRY_SYNC_INTERVAL = 1  # seconds between re-reads of the tracked match list from the store
+HISTORY_DB = os.environ.get('HISTORY_DB', '')  # SQLite file for ball-by-ball history; unset to disable
+HISTORY_FLUSH_INTERVAL = 1  # seconds the history writer batches snapshots before committing
+HISTORY_KEYFRAME_EVERY = 50  # rows between full snapshots; the rest store only changed fields
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') != '0'
+PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED') == '1'  # exposes /metrics/profile
+PROFILE_INTERVAL = 0.005  # seconds between stack samples
+PROFILE_MAX_SECONDS = 60
+LIVE_PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'index.html')
+LIVE_PAGE_MAX_AGE = 3600  # seconds browsers may reuse /live before revalidating its ETag
+GZIP_LEVEL = 6
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FAST_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01)
+
+class Colors:
+    """Terminal colors"""
+    HEADER = '\033[95m'
+    BLUE = '\033[94m'
+    CYAN = '\033[96m'
+    GREEN = '\033[92m'
+    WARNING = '\033[93m'
+    FAIL = '\033[91m'
+    ENDC = '\033[0m'
+    BOLD = '\033[1m'
+    UNDERLINE = '\033[4m'
+
+class Metric:
+    """Base for metrics exported at /metrics in the Prometheus text format"""
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        METRICS.append(self)
+
+    def _label_text(self, values, extra=()):
+        pairs = list(zip(self.labelnames, values)) + list(extra)
+        if not pairs:
+            return ''
+        return '{' + ','.join(f'{k}="{str(v)}"' for k, v in pairs) + '}'
+
+    def render(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self.samples()
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labelnames=()):
+        super().__init__(name, help_text, labelnames)
+        self._values = {}
+
+    def inc(self, *labels, amount=1):
+        if not METRICS_ENABLED: return
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{self._label_text(labels)} {value}" for labels, value in values]
+
+class Gauge(Metric):
+    """A value read from a callback at scrape time"""
+    kind = 'gauge'
+
+    def __init__(self, name, help_text, read):
+        super().__init__(name, help_text)
+        self.read = read
+
+    def samples(self):
+        return [f"{self.name} {self.read()}"]
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = buckets
+        self._series = {}  # labels -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value, *labels):
+        if not METRICS_ENABLED: return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def time(self, *labels):
+        return Timer(self, labels)
+
+    def samples(self):
+        with self._lock:
+            series = [(labels, list(values)) for labels, values in self._series.items()]
+        lines = []
+        for labels, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), values):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f"{self.name}_bucket{self._label_text(labels, [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_text(labels)} {values[-1]}")
+            lines.append(f"{self.name}_count{self._label_text(labels)} {cumulative}")
+        return lines
+
+class Timer:
+    """Context manager observing elapsed seconds into a histogram"""
+    __slots__ = ('histogram', 'labels', 'start')
+
+    def __init__(self, histogram, labels):
+        self.histogram, self.labels = histogram, labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labels)
+
+def render_metrics():
+    return "\n".join(line for metric in METRICS for line in metric.render()) + "\n"
+
+class SamplingProfiler:
+    """Samples every thread's stack at a fixed interval and counts folded stacks.
+
+    Output is one "frame;frame;frame count" line per distinct stack, the input
+    format of flamegraph.pl and speedscope. Under gevent only real OS threads
+    are visible, so profile with the dev server or a threaded worker.
+    """
+    def __init__(self, interval=PROFILE_INTERVAL):
+        self.interval = interval
+        self._lock = threading.Lock()
+
+    def profile(self, seconds):
+        if not self._lock.acquire(blocking=False):
+            return None  # one profile at a time
+        try:
+            stacks = {}
+            me = threading.get_ident()
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == me: continue
+                    names = []
+                    while frame is not None:
+                        code = frame.f_code
+                        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                        frame = frame.f_back
+                    key = ';'.join(reversed(names))
+                    stacks[key] = stacks.get(key, 0) + 1
+                time.sleep(self.interval)
+            return "\n".join(f"{stack} {count}" for stack, count in sorted(stacks.items(), key=lambda kv: -kv[1])) + "\n"
+        finally:
+            self._lock.release()
+
+METRICS = []
+FETCH_SECONDS = Histogram('crex_fetch_seconds', 'Time to get response headers from CREX, per attempt')
+UPSTREAM_REQUESTS = Counter('crex_requests_total', 'Requests sent to CREX by result', ('result',))
+SCRAPE_FAILURES = Counter('crex_scrape_failures_total', 'Scrapes that produced no snapshot')
+RATE_LIMITED = Counter('crex_rate_limited_total', 'Requests held back by a host budget or Retry-After', ('host',))
+EXTRACT_SECONDS = Histogram('title_extract_seconds', 'Time to read and extract the page title', ('path',))
+BYTES_READ = Counter('crex_bytes_read_total', 'Response body bytes read from CREX')
+CONNECTIONS_DROPPED = Counter('crex_connections_dropped_total', 'CREX connections closed with the body unread instead of pooled')
+SCRAPE_UNCHANGED = Counter('scrape_unchanged_total', 'Scrapes that skipped parsing because nothing changed', ('reason',))
+PARSE_SECONDS = Histogram('title_parse_seconds', 'Time spent in parse_title_data', buckets=FAST_BUCKETS)
+CACHE_REQUESTS = Counter('snapshot_cache_requests_total', 'Snapshot cache reads by outcome', ('result',))
+SERIALIZE_SECONDS = Histogram('serialize_seconds', 'Time spent encoding snapshots', ('format',), buckets=FAST_BUCKETS)
+HTTP_SECONDS = Histogram('http_request_duration_seconds', 'Flask request handling time', ('endpoint', 'method'))
+HTTP_REQUESTS = Counter('http_requests_total', 'Flask responses by status', ('endpoint', 'method', 'status'))
+profiler = SamplingProfiler()
+
+class RateLimited(Exception):
+    """Upstream asked us to slow down, or this host's request budget is spent"""
+    def __init__(self, host, retry_after):
+        super().__init__(f"{host} rate limited, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header (delta-seconds or HTTP-date), or None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+class HostBudget:
+    """Token bucket per upstream host, plus any Retry-After block the host has sent"""
+    __slots__ = ('tokens', 'updated', 'blocked_until')
+
+    def __init__(self):
+        self.tokens = HOST_BURST
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def ready_at(self, now):
+        """Earliest monotonic time a request may go out; 0.0 if one may go out now"""
+        self.tokens = min(HOST_BURST, self.tokens + (now - self.updated) * HOST_RATE)
+        self.updated = now
+        refill = 0.0 if self.tokens >= 1 else now + (1 - self.tokens) / HOST_RATE
+        return max(refill, self.blocked_until if self.blocked_until > now else 0.0)
+
+class CricketScraper:
+    def __init__(self):
+        self.headers = {
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+        }
+        # One pooled keep-alive session shared by every thread, so polls reuse
+        # TCP+TLS connections instead of paying a handshake each time
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=FETCH_WORKERS)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._host_slots = {}
+        self._host_lock = threading.Lock()
+        self._validators = {}  # url -> conditional request headers from the last 200
+        self._last = {}  # url -> (title digest, snapshot)
+        self._budgets = {}  # host -> HostBudget
+
+    def ready_at(self, url):
+        """Monotonic time from which a request to url's host fits its rate budget"""
+        host = urlparse(url).netloc
+        with self._host_lock:
+            budget = self._budgets.get(host)
+            return budget.ready_at(time.monotonic()) if budget else 0.0
+
+    def forget(self, url):
+        """Drop what is remembered about url once nothing tracks it"""
+        self._validators.pop(url, None)
+        self._last.pop(url, None)
+
+    def _budget(self, host, now):
+        """host's HostBudget, created on first use; call with _host_lock held"""
+        budget = self._budgets.get(host)
+        if budget is None:
+            # Hosts whose budget has refilled and isn't blocked lose nothing by starting over
+            for idle in [h for h, b in self._budgets.items()
+                         if b.ready_at(now) == 0.0 and b.tokens >= HOST_BURST]:
+                del self._budgets[idle]
+            budget = self._budgets[host] = HostBudget()
+        return budget
+
+    def _spend(self, host):
+        """Take one request from host's budget or raise RateLimited"""
+        now = time.monotonic()
+        with self._host_lock:
+            budget = self._budget(host, now)
+            ready = budget.ready_at(now)
+            if ready > now:
+                raise RateLimited(host, ready - now)
+            budget.tokens -= 1
+
+    def _block(self, host, seconds):
+        with self._host_lock:
+            budget = self._budget(host, time.monotonic())
+            budget.blocked_until = max(budget.blocked_until, time.monotonic() + seconds)
+
+    def _host_slot(self, url):
+        host = urlparse(url).netloc
+        with self._host_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(PER_HOST_CONCURRENCY)
+            return slot
+
+    def fetch_page(self, url, stream=False, headers=None):
+        """GET url over the pooled session, retrying transient failures with jittered backoff.
+
+        Every attempt spends from the host's rate budget. A 429, or a 503 with
+        Retry-After, blocks the host for that long and raises RateLimited
+        instead of retrying.
+        """
+        host = urlparse(url).netloc
+        for attempt in range(FETCH_RETRIES + 1):
+            self._spend(host)
+            try:
+                with self._host_slot(url), FETCH_SECONDS.time():
+                    response = self.session.get(url, timeout=FETCH_TIMEOUT, stream=stream, headers=headers)
+                UPSTREAM_REQUESTS.inc(str(response.status_code))
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                if response.status_code == 429 or (response.status_code == 503 and retry_after is not None):
+                    response.close()
+                    wait = retry_after if retry_after is not None else DEFAULT_RETRY_AFTER
+                    self._block(host, wait)
+                    raise RateLimited(host, wait)
+                if response.status_code < 500:
+                    if response.status_code >= 400: response.close()
+                    response.raise_for_status()
+                    return response
+                response.close()
+                error = requests.HTTPError(f"{response.status_code} Server Error for url: {url}", response=response)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                UPSTREAM_REQUESTS.inc('timeout' if isinstance(e, requests.Timeout) else 'connection_error')
+                error = e
+            if attempt < FETCH_RETRIES:
+                time.sleep(RETRY_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.5))
+        raise error
+
+    def scrape_crex_scores(self, match_url):
+        """Scrape live scores from CREX.
+
+        When the page or its title is unchanged since the last scrape, the
+        previous snapshot object itself is returned without re-parsing, so
+        callers can detect "nothing new" with an identity check.
+        """
+        try:
+            last = self._last.get(match_url)
+            conditional = self._validators.get(match_url) if last else None
+            response = self.fetch_page(match_url, stream=True, headers=conditional)
+            try:
+                if response.status_code == 304:
+                    SCRAPE_UNCHANGED.inc('not_modified')
+                    return last[1]
+                started = time.perf_counter()
+                title_text, path = self.extract_title(response)
+                EXTRACT_SECONDS.observe(time.perf_counter() - started, path)
+            finally:
+                response.close()
+            self._remember_validators(match_url, response)
+
+            digest = hashlib.blake2b(title_text.encode('utf-8'), digest_size=16).digest()
+            if last and last[0] == digest:
+                SCRAPE_UNCHANGED.inc('same_title')
+                return last[1]
+            
+            with PARSE_SECONDS.time():
+                data = self.parse_title_data(title_text)
+            data['timestamp'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self._last[match_url] = (digest, data)
+            
+            return data
+            
+        except RateLimited as e:
+            RATE_LIMITED.inc(urlparse(match_url).netloc)
+            print(f"{Colors.WARNING}Skipped scrape: {e}{Colors.ENDC}")
+            return None
+        except Exception as e:
+            SCRAPE_FAILURES.inc()
+            print(f"{Colors.FAIL}Error scraping: {str(e)}{Colors.ENDC}")
+            return None
+
+    def _remember_validators(self, url, response):
+        validators = {}
+        if response.headers.get('ETag'):
+            validators['If-None-Match'] = response.headers['ETag']
+        if response.headers.get('Last-Modified'):
+            validators['If-Modified-Since'] = response.headers['Last-Modified']
+        if validators:
+            self._validators[url] = validators
+        else:
+            self._validators.pop(url, None)
+
+    def extract_title(self, response):
+        """Pull the <title> text out of a streamed response; returns (title, 'fast' or 'fallback').
+
+        The fast path reads only until </title> and pulls the text out with a
+        regex. Pages without a title in the first STREAM_MAX_BYTES, or whose
+        title can't be decoded, are read in full and parsed with BeautifulSoup.
+        """
+        charset = requests.utils.get_encoding_from_headers(response.headers)
+        if charset == 'ISO-8859-1' and 'charset' not in response.headers.get('content-type', '').lower():
+            charset = None  # requests' text/* default, not something the server said
+        buf = bytearray()
+        exhausted = False
+        try:
+            for chunk in response.iter_content(STREAM_CHUNK_SIZE):
+                search_from = max(0, len(buf) - 16)
+                buf += chunk
+                end = TITLE_END_RE.search(buf, search_from)
+                if end:
+                    match = TITLE_RE.search(buf, 0, end.end())
+                    if match:
+                        title_text = html.unescape(match.group(1).decode(charset or 'utf-8')).strip()
+                        self._drain(response, len(buf))
+                        return title_text, 'fast'
+                    break
+                if len(buf) >= STREAM_MAX_BYTES:
+                    break
+            else:
+                exhausted = True
+        except (UnicodeDecodeError, LookupError):
+            pass
+
+        # A stream read to the end counts as consumed and response.content would raise
+        body = bytes(buf) if exhausted else bytes(buf) + response.content
+        BYTES_READ.inc(amount=len(body))
+        soup = BeautifulSoup(body, 'html.parser', from_encoding=charset)
+        title_elem = soup.find('title')
+        return (title_elem.text.strip() if title_elem else ""), 'fallback'
+
+    def _drain(self, response, read):
+        """Finish short bodies so the connection goes back to the pool; long ones are cut off.
+
+        Content-Length counts bytes on the wire, so progress is measured with
+        raw.tell(), not the decoded bytes read. Past STREAM_DRAIN_LIMIT, or
+        with no length to go by, closing and reconnecting next poll is cheaper
+        than downloading the rest of a page we don't need; those connections
+        are counted in crex_connections_dropped_total.
+        """
+        try:
+            remaining = int(response.headers.get('content-length', '')) - response.raw.tell()
+        except ValueError:
+            remaining = None
+        if remaining is not None and remaining <= STREAM_DRAIN_LIMIT:
+            read += len(response.content)
+        else:
+            CONNECTIONS_DROPPED.inc()
+        BYTES_READ.inc(amount=read)
+
+    def parse_title_data(self, title_text):
+        """Parse the title text to extract match information and state.
+
+        Splits and lowercases the title once, then walks each side of the
+        score with a single precompiled tokenizer. Output matches the original
+        regex-per-field parser (bench/legacy_parser.py) field for field.
+        """
+        parts = title_text.split(' | ')
+        score_part = parts[0]
+        data = dict(EMPTY_SNAPSHOT, title=title_text, livescore=score_part)
+        lowered = score_part.lower()
+
+        if "won by" in lowered or "beat" in lowered or "match drawn" in lowered:
+            data['matchState'] = 'ENDED'
+            data['result'] = score_part
+            if len(parts) > 1:
+                vs_match = ENDED_TEAMS_RE.search(parts[1])
+                if vs_match:
+                    data['team1_name'], data['team2_name'] = vs_match.group(1).strip(), vs_match.group(2).strip()
+                    data['shortTitle'] = f"{data['team1_name']} vs {data['team2_name']}"
+            return data
+
+        if "starts at" in lowered or STARTS_IN_RE.search(lowered):
+            data['matchState'] = 'UPCOMING'
+            vs_match = UPCOMING_TEAMS_RE.search(score_part.split(',', 1)[0])
+            if vs_match:
+                data['team1_name'], data['team2_name'] = vs_match.group(1).strip(), vs_match.group(2).strip()
+                data['shortTitle'] = f"{data['team1_name']} vs {data['team2_name']}"
+            time_match = START_DELAY_RE.search(score_part)
+            if time_match:
+                try:
+                    hours, minutes = int(time_match.group(1) or 0), int(time_match.group(2) or 0)
+                    start_time = datetime.utcnow() + timedelta(hours=hours, minutes=minutes)
+                    data['startTimeUTC'] = start_time.isoformat() + "Z"
+                except (OverflowError, ValueError) as e:
+                    print(f"Error parsing upcoming match time: {e}")
+            return data
+            
+        data['matchState'] = 'LIVE'
+        vs_index = score_part.find(' vs ')
+        if vs_index == -1:
+            return data
+        try:
+            team1_full, team2_full = score_part[:vs_index].strip(), score_part[vs_index + 4:].strip()
+
+            # Batting side: name, first score, first overs, and the batsmen after the first "score (overs)"
+            name_end = score = overs = batsmen_from = None
+            for token in BATTING_TOKEN_RE.finditer(team1_full):
+                kind = token.lastgroup
+                if name_end is None: name_end = token.start('overs' if kind == 'overs' else 0)
+                if kind == 'score':
+                    if score is None: score = token.group('runs', 'wkts')
+                    if token.group('att_overs') is not None:
+                        if overs is None: overs = token.group('att_overs')
+                        batsmen_from = token.end()
+                        break
+                elif kind == 'overs' and overs is None:
+                    overs = token.group('overs')
+
+            team1_name = team1_full if name_end is None else team1_full[:name_end]
+            team2_name, team2_score, team2_overs = self._scan_bowling_side(team2_full)
+            if team1_name: data['team1_name'] = team1_name.strip()
+            if team2_name: data['team2_name'] = team2_name.strip()
+            if team1_name and team2_name:
+                data['shortTitle'] = f"{data['team1_name']} vs {data['team2_name']}"
+
+            if score: data['team1_score'], data['team1_wickets'] = score
+            if overs: data['team1_overs'] = overs
+
+            if batsmen_from is not None:
+                batsmen_part = team1_full[batsmen_from:].strip()
+                if batsmen_part.startswith('(') and batsmen_part.endswith(')'):
+                    batsmen_list = batsmen_part[1:-1].split(',')
+                    for i, info in enumerate(batsmen_list[:2]):
+                        bat_match = BATSMAN_RE.match(info.strip())
+                        if bat_match:
+                            name, runs, balls = bat_match.groups()
+                            sr = f"{(int(runs) * 100 / int(balls)):.2f}" if int(balls) > 0 else "0.00"
+                            if i == 0:
+                                data.update({'batterone': name.strip(), 'batsmanonerun': runs, 'batsmanoneball': f"({balls})", 'batsmanonesr': sr})
+                            else:
+                                data.update({'battertwo': name.strip(), 'batsmantworun': runs, 'batsmantwoball': f"({balls})", 'batsmantwosr': sr})
+
+            if team2_score: data['team2_score'], data['team2_wickets'] = team2_score
+            if team2_overs: data['team2_overs'] = team2_overs
+            
+            if data['team2_score'] != '0':
+                data['team2_status'] = f"{data['team2_score']}-{data['team2_wickets']} ({data['team2_overs']} overs)"
+            
+            try:
+                t1_runs, t1_overs_dec = int(data['team1_score']), self.overs_to_decimal(data['team1_overs'])
+                if t1_overs_dec > 0:
+                    data['runrate'] = f'CRR: {round(t1_runs / t1_overs_dec, 2)}'
+                    t2_runs = int(data['team2_score'])
+                    if t2_runs > 0:
+                        target = t2_runs + 1
+                        runs_needed = target - t1_runs
+                        overs_left_dec = self.overs_to_decimal(data['team2_overs']) - t1_overs_dec
+                        if overs_left_dec > 0 and runs_needed > 0:
+                            data['runrate'] += f' | RRR: {round(runs_needed / overs_left_dec, 2)}'
+                        data['update'] = f"Target: {target}"
+            except (ValueError, ZeroDivisionError): pass
+        except Exception as e:
+            print(f"Error parsing live title: {str(e)}")
+        return data
+
+    def _scan_bowling_side(self, team2_full):
+        """Name, first score and first overs of the side after ' vs ' in one pass"""
+        name_end = score = overs = None
+        for token in BOWLING_TOKEN_RE.finditer(team2_full):
+            kind = token.lastgroup
+            if name_end is None: name_end = token.start('overs' if kind == 'overs' else 0)
+            if kind == 'score':
+                if score is None: score = token.group('runs', 'wkts')
+            elif kind == 'overs':
+                if overs is None: overs = token.group('overs')
+            if score is not None and overs is not None:
+                break
+        name = team2_full if name_end is None else team2_full[:name_end]
+        return name, score, overs
+    
+    def overs_to_decimal(self, overs):
+        try:
+            if '.' in overs:
+                parts = overs.split('.')
+                return int(parts[0]) + (int(parts[1]) / 6)
+            return float(overs)
+        except:
+            return 0.0
+
+class CacheEntry:
+    """Last good snapshot for one match URL, plus its encoded response bodies"""
+    __slots__ = ('data', 'fetched_at', 'inflight', 'bodies')
+
+    def __init__(self):
+        self.data = None
+        self.fetched_at = 0.0
+        self.inflight = None
+        self.bodies = (None, {})  # (snapshot, encoding -> bytes), swapped as one so bytes can't outlive their version
+
+def compress_body(body, encoding):
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    if encoding == 'br':
+        return brotli.compress(body)
+    return body
+
+def encode_snapshot(data, encoding='identity'):
+    """The exact JSON bytes jsonify would send, optionally compressed"""
+    with SERIALIZE_SECONDS.time('json'):
+        body = (app.json.dumps(data, separators=(',', ':')) + "\n").encode('utf-8')
+    return compress_body(body, encoding) if encoding != 'identity' else body
+
+# Content-Encodings we can produce, in our order of preference
+RESPONSE_ENCODINGS = ['br', 'gzip'] if brotli else ['gzip']
+
+class SnapshotCache:
+    """Score snapshots keyed by match URL with a TTL and single-flight upstream refresh.
+
+    However many viewers poll a match, at most one upstream fetch per URL runs at a
+    time. Concurrent readers of a stale entry get the last good snapshot if it is
+    within ``max_stale``, otherwise they wait for the in-flight fetch to finish.
+    """
+    def __init__(self, fetch, ttl=CACHE_TTL, max_stale=CACHE_MAX_STALE, wait_timeout=CACHE_WAIT_TIMEOUT):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.wait_timeout = wait_timeout
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.listeners = []  # called as listener(url, snapshot, previous) whenever a new version lands
+        self.scheduled = None  # callable(url): True when a poller keeps url fresh, so reads never refetch it
+
+    def _entry(self, url):
+        entry = self._entries.get(url)
+        if entry is None:
+            entry = self._entries[url] = CacheEntry()
+        return entry
+
+    def get(self, url):
+        """Return the snapshot for url, refreshing it upstream only when it has expired.
+
+        Scheduled URLs only expire while cold: their poller decides when to
+        go upstream, and readers get whatever it last published.
+        """
+        with self._lock:
+            entry = self._entry(url)
+            age = time.monotonic() - entry.fetched_at
+            if entry.data is not None and (age < self.ttl or entry.data.get('matchState') == 'ENDED'
+                                           or (self.scheduled and self.scheduled(url))):
+                CACHE_REQUESTS.inc('hit')
+                return entry.data
+            leader = entry.inflight is None
+            if leader:
+                entry.inflight = threading.Event()
+            event = entry.inflight
+        if leader:
+            CACHE_REQUESTS.inc('miss')
+            return self._fetch_into(url, entry, event) or entry.data
+        if entry.data is not None and age < self.max_stale:
+            CACHE_REQUESTS.inc('stale')
+            return entry.data
+        CACHE_REQUESTS.inc('wait')
+        event.wait(self.wait_timeout)
+        return entry.data
+
+    def refresh(self, url, fetch=None):
+        """Force an upstream fetch for url, joining one already in flight. Returns None on failure."""
+        with self._lock:
+            entry = self._entry(url)
+            leader = entry.inflight is None
+            if leader:
+                entry.inflight = threading.Event()
+            event = entry.inflight
+            previous = entry.fetched_at
+        if leader:
+            return self._fetch_into(url, entry, event, fetch)
+        event.wait(self.wait_timeout)
+        return entry.data if entry.fetched_at != previous else None
+
+    def forget(self, url):
+        """Drop url's entry; a fetch still in flight for it finishes without publishing"""
+        with self._lock:
+            self._entries.pop(url, None)
+
+    def peek(self, url):
+        """Return the cached snapshot for url without touching upstream"""
+        entry = self._entries.get(url)
+        return entry.data if entry else None
+
+    def body(self, url, data, encoding='identity'):
+        """Response bytes for a snapshot, encoded once per version and then shared by every reader"""
+        entry = self._entries.get(url)
+        owner, bodies = entry.bodies if entry else (None, None)
+        if owner is not data:
+            return encode_snapshot(data, encoding)
+        body = bodies.get(encoding)
+        if body is None:
+            body = bodies[encoding] = encode_snapshot(data, encoding)
+        return body
+
+    def _fetch_into(self, url, entry, event, fetch=None):
+        data = previous = None
+        changed = False
+        try:
+            data = (fetch or self.fetch)(url)
+        finally:
+            with self._lock:
+                if data:
+                    previous = entry.data
+                    changed = data is not previous
+                    if changed and 'version' not in data:  # snapshots read from the store keep the poller's version
+                        data['version'] = next_version(previous and previous.get('version'))
+                    if changed:
+                        entry.bodies = (data, {})
+                    entry.data, entry.fetched_at = data, time.monotonic()
+                    changed = changed and self._entries.get(url) is entry
+                entry.inflight = None
+            event.set()
+        if changed:
+            for listener in self.listeners:
+                listener(url, data, previous)
+        return data
+
+def snapshot_diff(previous, current):
+    """Fields of current that differ from previous; fields that disappeared map to None"""
+    changes = {k: v for k, v in current.items() if previous.get(k) != v}
+    changes.update({k: None for k in previous.keys() - current.keys()})
+    return changes
+
+def sse_message(event, data, event_id=None):
+    lines = [f"event: {event}"]
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return ("\n".join(lines) + "\n\n").encode('utf-8')
+
+class StreamChannel:
+    """Latest snapshot for one match URL, pre-encoded once for every subscriber"""
+    __slots__ = ('condition', 'version', 'previous_version', 'snapshot_message', 'diff_message')
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.version = None
+        self.previous_version = None
+        self.snapshot_message = None
+        self.diff_message = None
+
+class ScoreBroadcaster:
+    """Fans snapshot changes out to Server-Sent Events subscribers.
+
+    Each change is encoded once, as a full snapshot and as a field-level diff
+    against the previous version, and subscribers just copy those bytes. Idle
+    subscribers block on a per-match condition, or a shared one while there is
+    no match to follow; under gunicorn's gevent worker they are greenlets, so
+    thousands of open streams need no thread each.
+    """
+    def __init__(self):
+        self._channels = {}
+        self._lock = threading.Lock()
+        self._waiting = threading.Condition()  # subscribers with no match to follow yet
+        self.subscribers = 0
+
+    def channel(self, url):
+        with self._lock:
+            channel = self._channels.get(url)
+            if channel is None:
+                channel = self._channels[url] = StreamChannel()
+            return channel
+
+    def publish(self, url, data, previous=None):
+        channel = self.channel(url)
+        with SERIALIZE_SECONDS.time('sse'):
+            snapshot_message = sse_message('snapshot', data, data['version'])
+            diff_message = sse_message('diff', snapshot_diff(previous, data), data['version']) if previous else None
+        with channel.condition:
+            channel.previous_version = previous.get('version') if previous else None
+            channel.version = data['version']
+            channel.snapshot_message, channel.diff_message = snapshot_message, diff_message
+            channel.condition.notify_all()
+
+    def forget(self, url):
+        """Drop url's channel and wake its subscribers so they re-resolve what to follow"""
+        with self._lock:
+            channel = self._channels.pop(url, None)
+        if channel:
+            with channel.condition:
+                channel.condition.notify_all()
+
+    def wake_all(self):
+        """Wake every subscriber, e.g. so default-match streams notice the default changed"""
+        with self._lock:
+            channels = list(self._channels.values())
+        for channel in channels:
+            with channel.condition:
+                channel.condition.notify_all()
+        with self._waiting:
+            self._waiting.notify_all()
+
+    def subscribe(self, resolve_url, last_version=None):
+        """Yield SSE bytes for the match resolve_url() names, starting after last_version"""
+        with self._lock:
+            self.subscribers += 1
+        try:
+            yield f"retry: {STREAM_RETRY_MS}\n\n".encode('utf-8')
+            yield from self._stream(resolve_url, last_version)
+        finally:
+            with self._lock:
+                self.subscribers -= 1
+
+    def _stream(self, resolve_url, last_version):
+        sent_version, url = last_version, None
+        while True:
+            current_url = resolve_url()
+            if current_url != url:
+                if url is not None: sent_version = None  # a different match: start from a full snapshot
+                url = current_url
+            if url is None:
+                yield sse_message('waiting', {"error": "No match URL set."})
+                channel = None
+            else:
+                channel = self.channel(url)
+                with channel.condition:
+                    if channel.version is None or channel.version == sent_version:
+                        message = None
+                    elif channel.previous_version == sent_version and channel.diff_message:
+                        message = channel.diff_message
+                    else:
+                        message = channel.snapshot_message
+                    version = channel.version
+                if message:
+                    sent_version = version
+                    yield message
+                    continue
+            if channel is None:
+                with self._waiting:
+                    if resolve_url() is None:  # re-checked under the lock, so a wake_all can't slip past
+                        self._waiting.wait(STREAM_KEEPALIVE)
+                continue  # loops round to a fresh 'waiting' message, which doubles as the keepalive
+            with channel.condition:
+                if channel.version == sent_version:
+                    woke = channel.condition.wait(STREAM_KEEPALIVE)
+                else:
+                    woke = True
+            if not woke:
+                yield b": keepalive\n\n"
+
+class TrackedMatch:
+    """A match followed by the tracker, with its own refresh interval and lifecycle"""
+    def __init__(self, url, interval=UPDATE_INTERVAL):
+        self.id = match_id_for(url)
+        self.url = url
+        self.interval = interval
+        self.state = 'UNKNOWN'
+        self.active = True
+        # Spread first polls over one interval so matches don't all hit CREX at once
+        self.next_poll = time.monotonic() + random.uniform(0, interval)
+        self.added_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.polling = False
+        self.change_rate = 0.5  # moving average of how often a poll brings a new title
+        self.unchanged_polls = 0
+        self.failures = 0
+        self.delay = interval
+        self.version = None  # snapshot version the last poll was planned from
+
+    def to_dict(self, is_default=False):
+        return {
+            'id': self.id, 'url': self.url, 'state': self.state, 'interval': self.interval,
+            'active': self.active, 'default': is_default, 'added_at': self.added_at,
+            'next_poll_in': round(max(0.0, self.next_poll - time.monotonic()), 1) if self.active else None,
+            'poll_delay': round(self.delay, 1), 'change_rate': round(self.change_rate, 2),
+        }
+
+def match_id_for(url):
+    """Stable short id for a match URL"""
+    return hashlib.sha1(url.encode('utf-8')).hexdigest()[:10]
+
+def start_time_delay(start_time_utc):
+    """Seconds from now until an ISO startTimeUTC, or None if it can't be parsed"""
+    try:
+        start = datetime.fromisoformat(start_time_utc.rstrip('Z'))
+    except (AttributeError, ValueError):
+        return None
+    return (start - datetime.utcnow()).total_seconds()
+
+class SnapshotStore:
+    """SQLite file shared by every worker on a host: the tracked matches and their latest snapshots"""
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS snapshots (
+                url TEXT PRIMARY KEY, version INTEGER NOT NULL, data TEXT NOT NULL, updated_at REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS matches (
+                id TEXT PRIMARY KEY, url TEXT NOT NULL, interval INTEGER NOT NULL, added_at TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT);
+        """)
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def save_snapshot(self, url, data):
+        """Store data for url unless the store already has the same or a newer version"""
+        self._execute("""
+            INSERT INTO snapshots (url, version, data, updated_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT (url) DO UPDATE SET version = excluded.version, data = excluded.data, updated_at = excluded.updated_at
+            WHERE excluded.version > snapshots.version""",
+            (url, data['version'], json.dumps(data), time.time()))
+
+    def snapshot_version(self, url):
+        rows = self._execute('SELECT version FROM snapshots WHERE url = ?', (url,))
+        return rows[0][0] if rows else None
+
+    def load_snapshot(self, url):
+        rows = self._execute('SELECT data FROM snapshots WHERE url = ?', (url,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def save_match(self, match):
+        self._execute('INSERT OR REPLACE INTO matches (id, url, interval, added_at) VALUES (?, ?, ?, ?)',
+                      (match.id, match.url, match.interval, match.added_at))
+
+    def delete_match(self, match_id):
+        self._execute('DELETE FROM matches WHERE id = ?', (match_id,))
+
+    def set_default(self, match_id):
+        self._execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('default_match', ?)", (match_id,))
+
+    def load_matches(self):
+        """Return ([(id, url, interval, added_at), ...] in insertion order, default match id)"""
+        matches = self._execute('SELECT id, url, interval, added_at FROM matches ORDER BY rowid')
+        default = self._execute("SELECT value FROM settings WHERE key = 'default_match'")
+        return matches, default[0][0] if default else None
+
+def overs_to_balls(overs):
+    """'40.2' -> 242 legal balls; anything unparseable counts as 0"""
+    try:
+        whole, _, part = str(overs).partition('.')
+        return int(whole) * 6 + int(part or 0)
+    except ValueError:
+        return 0
+
+def has_over_position(data):
+    """True for LIVE snapshots whose title gave the batting side's overs"""
+    batting_side = data.get('livescore', '').split(' vs ', 1)[0]
+    return data.get('matchState') == 'LIVE' and BATTING_OVERS_RE.search(batting_side) is not None
+
+class HistoryStore:
+    """Append-only ball-by-ball history of every snapshot, per match, in SQLite (WAL).
+
+    Rows hold zlib-compressed field diffs against the previous row, with a
+    full snapshot every HISTORY_KEYFRAME_EVERY rows so a range query can
+    rebuild state from the nearest keyframe instead of replaying the match.
+    Rows are keyed by (match, seq) and indexed by (match, innings, balls).
+    Writes are queued and committed in batches by a background thread.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._db = self._connect()
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS history (
+                match_id TEXT NOT NULL, seq INTEGER NOT NULL, version INTEGER NOT NULL,
+                recorded_at REAL NOT NULL, innings INTEGER NOT NULL, balls INTEGER NOT NULL,
+                keyframe INTEGER NOT NULL, delta BLOB NOT NULL,
+                PRIMARY KEY (match_id, seq)) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS history_by_ball ON history (match_id, innings, balls);
+        """)
+        self._tails = {}  # match_id -> state of the last row written, for the writer thread only
+        threading.Thread(target=self._writer, daemon=True, name='history-writer').start()
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('PRAGMA synchronous=NORMAL')
+        return db
+
+    def record(self, match_id, data):
+        """Queue a snapshot; returns immediately"""
+        self._queue.put((match_id, data, time.time()))
+
+    def _writer(self):
+        db = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + HISTORY_FLUSH_INTERVAL
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                rows = [row for row in (self._row(db, *item) for item in batch) if row]
+                if rows:
+                    db.execute('BEGIN')
+                    db.executemany('INSERT OR IGNORE INTO history VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+                    db.execute('COMMIT')
+            except sqlite3.Error as e:
+                print(f"{Colors.FAIL}[History] Failed to write {len(batch)} snapshots: {e}{Colors.ENDC}")
+                if db.in_transaction: db.execute('ROLLBACK')
+
+    def _row(self, db, match_id, data, recorded_at):
+        tail = self._tails.get(match_id)
+        if tail is None:
+            last = db.execute('SELECT seq, innings FROM history WHERE match_id = ? ORDER BY seq DESC LIMIT 1',
+                              (match_id,)).fetchone()
+            # After a restart the previous snapshot isn't in memory, so the next row is a keyframe
+            tail = self._tails[match_id] = {'seq': last[0] if last else -1, 'innings': max(1, last[1]) if last else 1,
+                                            'keyframe_seq': None, 'data': None}
+        previous = tail['data']
+        if previous is not None and previous.get('version') == data.get('version'):
+            return None
+        # A new batting side means a new innings, but only between two live rows:
+        # an upcoming title lists the teams in fixture order, not batting order
+        if previous is not None and previous.get('matchState') == 'LIVE' and data.get('matchState') == 'LIVE' \
+                and data.get('team1_name') != previous.get('team1_name') and previous.get('team1_name') != 'Team 1':
+            tail['innings'] += 1
+        # Rows with no over position (pre-match, results, scoreless titles between
+        # innings) go in innings 0 so they never show up as ball 0 of an innings
+        innings = tail['innings'] if has_over_position(data) else 0
+        tail['seq'] += 1
+        keyframe = previous is None or tail['seq'] - tail['keyframe_seq'] >= HISTORY_KEYFRAME_EVERY
+        if keyframe:
+            tail['keyframe_seq'] = tail['seq']
+        delta = data if keyframe else snapshot_diff(previous, data)
+        tail['data'] = data
+        return (match_id, tail['seq'], data['version'], recorded_at, innings,
+                overs_to_balls(data.get('team1_overs')), int(keyframe),
+                zlib.compress(json.dumps(delta, separators=(',', ':')).encode('utf-8')))
+
+    def _query(self, sql, params):
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def innings(self, match_id):
+        rows = self._query('SELECT MAX(innings) FROM history WHERE match_id = ?', (match_id,))
+        return rows[0][0] or 0
+
+    def query(self, match_id, innings, from_balls=0, to_balls=None):
+        """Snapshots of one innings whose balls bowled fall in [from_balls, to_balls], oldest first"""
+        hits = self._query(
+            'SELECT seq FROM history WHERE match_id = ? AND innings = ? AND balls BETWEEN ? AND ? ORDER BY seq',
+            (match_id, innings, from_balls, to_balls if to_balls is not None else 2 ** 31))
+        if not hits:
+            return []
+        wanted = {seq for seq, in hits}
+        first, last = hits[0][0], hits[-1][0]
+        start = self._query('SELECT MAX(seq) FROM history WHERE match_id = ? AND seq <= ? AND keyframe = 1',
+                            (match_id, first))[0][0]
+        rows = self._query(
+            'SELECT seq, recorded_at, innings, keyframe, delta FROM history WHERE match_id = ? AND seq BETWEEN ? AND ? ORDER BY seq',
+            (match_id, start if start is not None else first, last))
+        points, state = [], {}
+        for seq, recorded_at, row_innings, keyframe, delta in rows:
+            changes = json.loads(zlib.decompress(delta))
+            if keyframe:
+                state = changes
+            else:
+                state = dict(state)
+                for key, value in changes.items():
+                    if value is None: state.pop(key, None)
+                    else: state[key] = value
+            if seq in wanted:
+                points.append({'seq': seq, 'recorded_at': recorded_at, 'innings': row_innings, 'snapshot': state})
+        return points
+
+class StoreReader:
+    """Cache fetch function for workers that don't poll: reads the poller's snapshots from the store.
+
+    Returns the same object while the stored version is unchanged, so the
+    cache sees "nothing new" exactly as it does for an unchanged scrape.
+    """
+    def __init__(self, store):
+        self.store = store
+        self._last = {}
+
+    def __call__(self, url):
+        version = self.store.snapshot_version(url)
+        if version is None:
+            return None
+        last = self._last.get(url)
+        if last is not None and last['version'] == version:
+            return last
+        data = self._last[url] = self.store.load_snapshot(url)
+        return data
+
+    def forget(self, url):
+        self._last.pop(url, None)
+
+class PollerLock:
+    """Exclusive, non-blocking lock on a file, held for the life of the process that wins it.
+
+    The OS drops the lock when its holder exits, so another worker takes over polling.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+
+    @property
+    def held(self):
+        return self._fd is not None
+
+    def acquire(self):
+        import fcntl  # Unix only, like gunicorn itself
+        if self._fd is not None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+class MatchRegistry:
+    """All tracked matches, their poll schedule and the default match.
+
+    With a store, the match list and default are shared with the other
+    workers on the host; schedules stay local to the process that polls.
+    """
+    def __init__(self, store=None):
+        self._matches = {}
+        self._lock = threading.Lock()
+        self.default_id = None
+        self.store = store
+        self._synced_at = 0.0
+        self.removal_listeners = []  # called as listener(url) when a match stops being tracked in this process
+        self.default_listeners = []  # called as listener() when default_id changes, here or via sync
+
+    @property
+    def default(self):
+        return self._matches.get(self.default_id)
+
+    def add(self, url, interval=None, default=False):
+        """Track url (or return the existing entry for it), optionally making it the default match"""
+        self.sync(force=True)
+        previous_default = self.default_id
+        with self._lock:
+            match = self._matches.get(match_id_for(url))
+            if match is None:
+                match = self._matches[match_id_for(url)] = TrackedMatch(url, interval or UPDATE_INTERVAL)
+            elif interval:
+                match.interval = interval
+            if default or self.default_id is None:
+                self.default_id = match.id
+            if self.store:
+                self.store.save_match(match)
+                self.store.set_default(self.default_id)
+        self._default_changed(previous_default)
+        return match
+
+    def get(self, match_id):
+        return self._matches.get(match_id)
+
+    def tracks(self, url):
+        return match_id_for(url) in self._matches
+
+    def remove(self, match_id):
+        self.sync(force=True)
+        previous_default = self.default_id
+        with self._lock:
+            match = self._matches.pop(match_id, None)
+            if match and self.default_id == match_id:
+                self.default_id = next(iter(self._matches), None)
+            if match and self.store:
+                self.store.delete_match(match_id)
+                self.store.set_default(self.default_id)
+        if match:
+            self._removed([match])
+        self._default_changed(previous_default)
+        return match
+
+    def sync(self, force=False):
+        """Pick up matches other workers added or removed; at most once per REGISTRY_SYNC_INTERVAL"""
+        now = time.monotonic()
+        if not self.store or (not force and now - self._synced_at < REGISTRY_SYNC_INTERVAL):
+            return
+        self._synced_at = now
+        rows, default_id = self.store.load_matches()
+        previous_default = self.default_id
+        with self._lock:
+            matches = {}
+            for match_id, url, interval, added_at in rows:
+                match = self._matches.get(match_id)
+                if match is None:
+                    match = TrackedMatch(url, interval)
+                    match.added_at = added_at
+                match.interval = interval
+                matches[match_id] = match
+            removed = [m for match_id, m in self._matches.items() if match_id not in matches]
+            self._matches = matches
+            self.default_id = default_id if default_id in matches else None
+        self._removed(removed)
+        self._default_changed(previous_default)
+
+    def _removed(self, matches):
+        for match in matches:
+            for listener in self.removal_listeners:
+                listener(match.url)
+
+    def _default_changed(self, previous_default):
+        if self.default_id != previous_default:
+            for listener in self.default_listeners:
+                listener()
+
+    def all(self):
+        return list(self._matches.values())
+
+    def due(self):
+        now = time.monotonic()
+        return [m for m in self.all() if m.active and not m.polling and m.next_poll <= now]
+
+    def observe(self, match, data, not_before=0.0):
+        """Update a match's lifecycle from a poll and plan the next one.
+
+        Live matches are polled faster while most polls bring a new ball and
+        back off exponentially once the title stops changing (drinks, innings
+        breaks, rain), snapping back on the next change. Upcoming matches wait
+        until UPCOMING_LEAD_TIME before their start, ended matches are no
+        longer polled, and failures back off. Nothing is scheduled before
+        not_before, when the host's rate budget or Retry-After allows it.
+
+        "Changed" means a version newer than the last one planned from, so a
+        ball fetched by /api/scrape between polls still counts as a change.
+        """
+        now = time.monotonic()
+        if data:
+            match.state = data.get('matchState', 'UNKNOWN')
+        if match.state == 'ENDED':
+            match.active = False
+            return
+        match.active = True
+
+        if not data:
+            match.failures += 1
+            delay = min(match.interval * 2 ** match.failures, MAX_POLL_INTERVAL)
+        else:
+            changed = data.get('version') != match.version
+            match.version = data.get('version')
+            match.failures = 0
+            match.unchanged_polls = 0 if changed else match.unchanged_polls + 1
+            match.change_rate += CHANGE_RATE_WEIGHT * ((1.0 if changed else 0.0) - match.change_rate)
+            if match.unchanged_polls >= BREAK_AFTER_POLLS:
+                delay = min(match.interval * 2 ** (match.unchanged_polls - BREAK_AFTER_POLLS + 1), MAX_POLL_INTERVAL)
+            elif match.state == 'LIVE':
+                delay = max(LIVE_MIN_INTERVAL, match.interval * (1.5 - match.change_rate))
+            else:
+                delay = match.interval
+        # Up to 10% jitter keeps matches on the same cadence from lining up
+        next_poll = now + delay * random.uniform(0.9, 1.0)
+        if match.state == 'UPCOMING' and data:
+            until_start = start_time_delay(data.get('startTimeUTC'))
+            if until_start is not None and until_start > UPCOMING_LEAD_TIME:
+                next_poll = max(next_poll, now + until_start - UPCOMING_LEAD_TIME)
+        match.next_poll = max(next_poll, not_before)
+        match.delay = match.next_poll - now
+
+    def to_dict(self):
+        return {'default': self.default_id, 'matches': [m.to_dict(m.id == self.default_id) for m in self.all()]}
+
+URL_INPUT_PAGE = """
+<!DOCTYPE html><html><head><title>Cricket Score Tracker - Control Panel</title><style>*{margin:0;padding:0;box-sizing:border-box}body{font-family:'Segoe UI',sans-serif;background:linear-gradient(135deg,#0f0c29 0%,#302b63 50%,#24243e 100%);color:white;min-height:100vh;padding:20px}.container{max-width:800px;margin:0 auto}.card{background:rgba(255,255,255,0.1);padding:30px;border-radius:20px;backdrop-filter:blur(10px);margin-bottom:20px;box-shadow:0 8px 32px 0 rgba(31,38,135,0.37)}h1{margin-bottom:30px;text-align:center;font-size:2.5rem}h2{margin-bottom:20px;color:#667eea}input{width:100%;padding:15px;font-size:16px;border:none;border-radius:10px;background:rgba(255,255,255,0.2);color:white;margin-bottom:20px}input::placeholder{color:rgba(255,255,255,0.7)}button{background:linear-gradient(135deg,#667eea 0%,#764ba2 100%);color:white;border:none;padding:12px 30px;font-size:16px;border-radius:50px;cursor:pointer;transition:all .3s ease;margin-right:10px}button:hover{transform:translateY(-2px);box-shadow:0 5px 20px rgba(0,0,0,0.3)}.status{padding:15px;border-radius:10px;margin-top:20px}.success{background:rgba(46,204,113,0.2);color:#2ecc71}.error{background:rgba(231,76,60,0.2);color:#e74c3c}.info{background:rgba(52,152,219,0.2);color:#3498db}.current-match{display:grid;grid-template-columns:1fr 1fr;gap:20px;margin-top:20px}.stat-box{background:rgba(255,255,255,0.05);padding:20px;border-radius:10px;text-align:center}.stat-label{font-size:.9rem;opacity:.8;margin-bottom:5px}.stat-value{font-size:1.5rem;font-weight:bold;color:#ffd93d}.endpoints{background:rgba(255,255,255,0.05);padding:20px;border-radius:10px;margin-top:20px}.endpoint{padding:10px;margin:5px 0;background:rgba(255,255,255,0.05);border-radius:5px;font-family:monospace}.live-indicator{display:inline-block;width:10px;height:10px;background:#2ecc71;border-radius:50%;animation:pulse 2s infinite;margin-right:10px}@keyframes pulse{0%{box-shadow:0 0 0 0 rgba(46,204,113,0.7)}70%{box-shadow:0 0 0 10px rgba(46,204,113,0)}100%{box-shadow:0 0 0 0 rgba(46,204,113,0)}}</style></head><body><div class=container><div class=card><h1>🏏 Cricket Score Tracker</h1><form onsubmit=setURL(event)><input type=url id=matchUrl placeholder=... required value="{{ current_url or '' }}"><div><button type=submit>Start Tracking</button><button type=button onclick=refreshScores()>🔄 Refresh Now</button><button type=button onclick=toggleAutoUpdate()><span id=autoUpdateBtn>{{ '⏸️ Pause' if auto_update else '▶️ Resume' }} Auto-Update</span></button><button type=button onclick="window.location.href='/live'">📺 View Live Scores</button></div></form><div id=status></div></div>{% if current_url and match_data %}<div class=card><h2><span class=live-indicator></span>Current Match</h2><div class=current-match><div class=stat-box><div class=stat-label>{{ match_data.get('team1_name', 'Team 1') }}</div><div class=stat-value>{{ match_data.get('team1_score', '0') }}-{{ match_data.get('team1_wickets', '0') }}</div><div style=opacity:.8>({{ match_data.get('team1_overs', '0') }} overs)</div></div><div class=stat-box><div class=stat-label>{{ match_data.get('team2_name', 'Team 2') }}</div>{% if match_data.get('team2_status', 'Yet to bat') != 'Yet to bat' %}<div class=stat-value>{{ match_data.get('team2_score', '0') }}-{{ match_data.get('team2_wickets', '0') }}</div><div style=opacity:.8>({{ match_data.get('team2_overs', '0') }} overs)</div>{% else %}<div class=stat-value>Yet to bat</div>{% endif %}</div><div class=stat-box><div class=stat-label>Run Rate</div><div class=stat-value>{{ match_data.get('runrate', 'CRR: 0.00') }}</div></div><div class=stat-box><div class=stat-label>Last Update</div><div class=stat-value>{{ match_data.get('timestamp', 'N/A') }}</div></div></div>{% if match_data.get('batterone', 'Batsman 1') != 'Batsman 1' %}<div class=stat-box style=margin-top:20px><h3 style=margin-bottom:15px>Current Batsmen</h3><p>🏏 {{ match_data.get('batterone') }}: {{ match_data.get('batsmanonerun') }} {{ match_data.get('batsmanoneball') }} SR: {{ match_data.get('batsmanonesr') }}</p>{% if match_data.get('battertwo', 'Batsman 2') != 'Batsman 2' %}<p>🏏 {{ match_data.get('battertwo') }}: {{ match_data.get('batsmantworun') }} {{ match_data.get('batsmantwoball') }} SR: {{ match_data.get('batsmantwosr') }}</p>{% endif %}</div>{% endif %}</div>{% endif %}<div class=card><h2>API Endpoints</h2><div class=endpoints><div class=endpoint>GET /api/current-score - Get current match scores</div><div class=endpoint>GET /api/scrape?url={match_url} - Scrape specific match</div><div class=endpoint>POST /api/set-url - Set new match URL</div><div class=endpoint>GET /api/stream?match={id} - Live score updates (Server-Sent Events)</div><div class=endpoint>GET /api/matches - List tracked matches</div><div class=endpoint>POST /api/matches - Track another match</div><div class=endpoint>GET /api/matches/{id}/score - Get scores for a tracked match</div><div class=endpoint>GET /api/matches/{id}/history?from_over=&to_over= - Ball-by-ball history</div><div class=endpoint>DELETE /api/matches/{id} - Stop tracking a match</div><div class=endpoint>GET /metrics - Prometheus metrics</div></div></div></div><script>let autoUpdate={{ 'true' if auto_update else 'false' }};async function setURL(e){e.preventDefault();const t=document.getElementById("matchUrl").value,s=document.getElementById("status");s.innerHTML="⏳ Setting up tracking...",s.className="status info";try{const e=await fetch("/api/set-url",{method:"POST",headers:{"Content-Type":"application/json"},body:JSON.stringify({url:t})}),a=await e.json();e.ok?(s.innerHTML="✅ Tracking started successfully!",s.className="status success",setTimeout(()=>window.location.reload(),1500)):(s.innerHTML="❌ "+(a.error||"Failed to set URL"),s.className="status error")}catch(e){s.innerHTML="❌ Error: "+e.message,s.className="status error"}}async function refreshScores(){const e=document.getElementById("status");e.innerHTML="🔄 Refreshing scores...",e.className="status info";try{const t=await fetch("/api/scrape");await t.json();t.ok?(e.innerHTML="✅ Scores refreshed!",e.className="status success",setTimeout(()=>window.location.reload(),1e3)):(e.innerHTML="❌ Failed to refresh scores",e.className="status error")}catch(t){e.innerHTML="❌ Error: "+t.message,e.className="status error"}}async function toggleAutoUpdate(){autoUpdate=!autoUpdate;const e=document.getElementById("autoUpdateBtn");e.textContent=autoUpdate?"⏸️ Pause Auto-Update":"▶️ Resume Auto-Update";try{await fetch("/api/toggle-auto-update",{method:"POST"})}catch(e){console.error("Failed to toggle auto-update:",e)}}autoUpdate&&(window.EventSource?new EventSource("/api/stream").addEventListener("diff",()=>window.location.reload()):setInterval(()=>{window.location.reload()},3e4))</script></body></html>
+"""
+
+scraper = CricketScraper()
+snapshot_cache = SnapshotCache(scraper.scrape_crex_scores)
+snapshot_store = SnapshotStore(SNAPSHOT_STORE) if SNAPSHOT_STORE else None
+registry = MatchRegistry(snapshot_store)
+broadcaster = ScoreBroadcaster()
+snapshot_cache.listeners.append(broadcaster.publish)
+if snapshot_store:
+    snapshot_cache.listeners.append(lambda url, data, previous: snapshot_store.save_snapshot(url, data))
+update_pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix='auto-update')
+history = HistoryStore(HISTORY_DB) if HISTORY_DB else None
+
+def forget_match(url):
+    """Registry removal listener: free what this process keeps per URL for a match no longer tracked"""
+    snapshot_cache.forget(url)
+    scraper.forget(url)
+    broadcaster.forget(url)
+
+registry.removal_listeners.append(forget_match)
+registry.default_listeners.append(broadcaster.wake_all)  # default-match streams re-resolve, whichever worker moved it
+
+def record_history(url, data, previous):
+    """Cache listener: write every new version of a tracked match, however it was fetched.
+
+    Only the process that scrapes CREX writes; workers mirroring the store
+    would otherwise record the poller's versions a second time.
+    """
+    match = registry.get(match_id_for(url))
+    if match and not isinstance(snapshot_cache.fetch, StoreReader):
+        history.record(match.id, data)
+
+if history:
+    snapshot_cache.listeners.append(record_history)
+
+Gauge('tracked_matches', 'Matches in the registry', lambda: len(registry.all()))
+Gauge('sse_subscribers', 'Open /api/stream connections in this process', lambda: broadcaster.subscribers)
+Gauge('history_queue_depth', 'Snapshots waiting to be written to history', lambda: history._queue.qsize() if history else 0)
+
+@app.before_request
+def sync_registry():
+    request.started_at = time.perf_counter()
+    registry.sync()
+
+@app.after_request
+def record_request_metrics(response):
+    started = getattr(request, 'started_at', None)
+    if started is not None and METRICS_ENABLED:
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        HTTP_SECONDS.observe(time.perf_counter() - started, endpoint, request.method)
+        HTTP_REQUESTS.inc(endpoint, request.method, str(response.status_code))
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus text exposition; each gunicorn worker reports its own numbers"""
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/metrics/profile')
+def sample_profile():
+    """Sample stacks for ?seconds=N (default 10) and return them folded for flame graphs"""
+    if not PROFILER_ENABLED: return jsonify({"error": "Profiler is disabled; set PROFILER_ENABLED=1"}), 404
+    try:
+        seconds = min(float(request.args.get('seconds', 10)), PROFILE_MAX_SECONDS)
+    except ValueError:
+        return jsonify({"error": "seconds must be a number"}), 400
+    folded = profiler.profile(seconds)
+    if folded is None: return jsonify({"error": "A profile is already running"}), 409
+    return Response(folded, mimetype='text/plain')
+
+def default_match_data():
+    match = registry.default
+    return snapshot_cache.peek(match.url) if match else None
+
+def track_match(url, interval=None, default=False):
+    """Register a match and fetch its first snapshot"""
+    match = registry.add(url, interval, default=default)
+    data = snapshot_cache.refresh(url, fetch=scraper.scrape_crex_scores)
+    registry.observe(match, data)
+    return match, data
+
+def encoded_response(body, encoding, mimetype, headers=None):
+    response = Response(body, mimetype=mimetype, headers=headers)
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+class StaticPage:
+    """A file read once at startup and kept in memory, precompressed, with a strong ETag"""
+    def __init__(self, path, mimetype='text/html'):
+        self.mimetype = mimetype
+        try:
+            with open(path, 'rb') as f:
+                body = f.read()
+        except OSError:
+            self.bodies = None
+            return
+        self.etag = hashlib.sha1(body).hexdigest()
+        self.bodies = {'identity': body}
+        self.bodies.update({encoding: compress_body(body, encoding) for encoding in RESPONSE_ENCODINGS})
+
+    def response(self):
+        encoding = request.accept_encodings.best_match(RESPONSE_ENCODINGS) or 'identity'
+        response = encoded_response(self.bodies[encoding], encoding, self.mimetype)
+        response.cache_control.public = True
+        response.cache_control.max_age = LIVE_PAGE_MAX_AGE
+        response.set_etag(f"{self.etag}-{encoding}")
+        return response.make_conditional(request)
+
+HOME_TEMPLATE = app.jinja_env.from_string(URL_INPUT_PAGE)
+LIVE_PAGE_CACHE = StaticPage(LIVE_PAGE)
+
+@app.route('/')
+def home():
+    match = registry.default
+    return HOME_TEMPLATE.render(current_url=match.url if match else None, match_data=default_match_data() or {}, auto_update=AUTO_UPDATE)
+
+@app.route('/live')
+def live_scores():
+    if LIVE_PAGE_CACHE.bodies:
+        return LIVE_PAGE_CACHE.response()
+    return "<h3>index.html not found!</h3>"
+
+@app.route('/api/set-url', methods=['POST'])
+def set_url():
+    url = request.json.get('url')
+    if not url: return jsonify({"error": "URL is required"}), 400
+    match, scraped_data = track_match(url, default=True)
+    if scraped_data:
+        print_match_update(scraped_data)
+        return jsonify({"message": "URL set successfully", "match_id": match.id, "initial_data": scraped_data})
+    return jsonify({"error": "Failed to scrape initial data"}), 500
+
+# Browsers may keep the body but must revalidate it; unchanged snapshots come back as 304
+SCORE_HEADERS = {'Cache-Control': 'no-cache'}
+
+@app.route('/api/current-score')
+def get_current_score():
+    headers = SCORE_HEADERS
+    match = registry.default
+    if not match:
+        return jsonify({"error": "No match URL set."}), 400, headers
+    return match_score_response(match, headers)
+
+def match_score_response(match, headers):
+    # Served from the shared snapshot cache: at most one upstream fetch per TTL
+    # no matter how many viewers are polling, last good data if CREX fails
+    data = snapshot_cache.get(match.url)
+    if data:
+        encoding = request.accept_encodings.best_match(RESPONSE_ENCODINGS) or 'identity'
+        response = encoded_response(snapshot_cache.body(match.url, data, encoding), encoding, 'application/json', headers)
+        # Weak: the gzip and plain bodies of one version share it
+        response.set_etag(str(data['version']), weak=True)
+        return response.make_conditional(request)
+    return jsonify({"error": "No data available yet."}), 503, headers
+
+@app.route('/api/scrape')
+def scrape_match():
+    match = registry.default
+    match_url = request.args.get('url') or (match.url if match else None)
+    if not match_url: return jsonify({"error": "No match URL provided or set"}), 400
+    if registry.tracks(match_url):
+        data = snapshot_cache.refresh(match_url, fetch=scraper.scrape_crex_scores)
+    else:
+        # A one-off look at an untracked URL: nothing is kept for it afterwards
+        data = scraper.scrape_crex_scores(match_url)
+        scraper.forget(match_url)
+    if data:
+        print_match_update(data)
+        return jsonify(data)
+    return jsonify({"error": "Unable to scrape match data"}), 500
+
+@app.route('/api/stream')
+def stream_scores():
+    """Server-Sent Events: a full snapshot on connect, then field-level diffs as the score changes"""
+    match_id = request.args.get('match')
+    if match_id:
+        match = registry.get(match_id)
+        if not match: return jsonify({"error": "Unknown match"}), 404
+        resolve_url = lambda: match.url if registry.tracks(match.url) else None
+    else:
+        resolve_url = lambda: (default := registry.default) and default.url
+    url = resolve_url()
+    if url: snapshot_cache.get(url)  # make sure there is something to send on connect
+    try:
+        last_version = int(request.headers.get('Last-Event-ID', ''))
+    except ValueError:
+        last_version = None
+    stream = broadcaster.subscribe(resolve_url, last_version)
+    return Response(stream_with_context(stream), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/matches', methods=['GET'])
+def list_matches():
+    return jsonify(registry.to_dict())
+
+@app.route('/api/matches', methods=['POST'])
+def add_match():
+    payload = request.json or {}
+    url = payload.get('url')
+    if not url: return jsonify({"error": "URL is required"}), 400
+    try:
+        interval = int(payload['interval']) if payload.get('interval') else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "interval must be a number of seconds"}), 400
+    if interval is not None and interval < 1:
+        return jsonify({"error": "interval must be at least 1 second"}), 400
+    match, data = track_match(url, interval, default=bool(payload.get('default')))
+    return jsonify({"match": match.to_dict(match.id == registry.default_id), "initial_data": data}), 201
+
+@app.route('/api/matches/<match_id>', methods=['GET'])
+def get_match(match_id):
+    match = registry.get(match_id)
+    if not match: return jsonify({"error": "Unknown match"}), 404
+    return jsonify(match.to_dict(match.id == registry.default_id))
+
+@app.route('/api/matches/<match_id>', methods=['DELETE'])
+def remove_match(match_id):
+    match = registry.remove(match_id)
+    if not match: return jsonify({"error": "Unknown match"}), 404
+    return jsonify({"message": "Match removed", "id": match.id})
+
+@app.route('/api/matches/<match_id>/score')
+def get_match_score(match_id):
+    headers = SCORE_HEADERS
+    match = registry.get(match_id)
+    if not match:
+        return jsonify({"error": "Unknown match"}), 404, headers
+    return match_score_response(match, headers)
+
+@app.route('/api/matches/<match_id>/history')
+def get_match_history(match_id):
+    """Snapshots recorded for a match, optionally limited to an innings and an over range"""
+    if not history: return jsonify({"error": "History is disabled"}), 404
+    try:
+        innings = [int(request.args['innings'])] if request.args.get('innings') else None
+    except ValueError:
+        return jsonify({"error": "innings must be a number"}), 400
+    for name in ('from_over', 'to_over'):
+        if request.args.get(name) and not OVER_PARAM_RE.match(request.args[name]):
+            return jsonify({"error": f"{name} must be overs like 12 or 12.3"}), 400
+    from_balls = overs_to_balls(request.args.get('from_over') or 0)
+    to_balls = overs_to_balls(request.args['to_over']) if request.args.get('to_over') else None
+    fields = [f for f in request.args.get('fields', '').split(',') if f]
+    if innings is None:
+        innings = list(range(1, history.innings(match_id) + 1))
+        if not innings and not registry.get(match_id):
+            return jsonify({"error": "Unknown match"}), 404
+    points = []
+    for number in innings:
+        points.extend(history.query(match_id, number, from_balls, to_balls))
+    for point in points:
+        snapshot = point.pop('snapshot')
+        point['version'] = snapshot.get('version')
+        point['over'] = snapshot.get('team1_overs')
+        point['data'] = {f: snapshot.get(f) for f in fields} if fields else snapshot
+    return jsonify({"match_id": match_id, "points": points})
+
+def print_banner():
+    os.system('cls' if os.name == 'nt' else 'clear')
+    print(f"{Colors.CYAN}╔═══════════════════════════════════════════════════════════╗\n"
+          f"║         {Colors.BOLD}🏏  CRICKET SCORE TRACKER - CREX SCRAPER  🏏{Colors.ENDC}{Colors.CYAN}         ║\n"
+          f"╚═══════════════════════════════════════════════════════════╝{Colors.ENDC}")
+
+def print_match_update(data):
+    print(f"\n{Colors.GREEN}━━━ Match Update at {data.get('timestamp', '')} ━━━{Colors.ENDC}")
+    print(f"{Colors.BOLD}Score:{Colors.ENDC} {data.get('livescore', 'N/A')}")
+    if data.get('batterone', 'Batsman 1') != 'Batsman 1':
+        print(f"\n{Colors.CYAN}At the Crease:{Colors.ENDC}")
+        print(f"  • {data.get('batterone')}: {data.get('batsmanonerun')}{data.get('batsmanoneball')} SR: {data.get('batsmanonesr')}")
+        if data.get('battertwo', 'Batsman 2') != 'Batsman 2':
+            print(f"  • {data.get('battertwo')}: {data.get('batsmantworun')}{data.get('batsmantwoball')} SR: {data.get('batsmantwosr')}")
+    print(f"{Colors.GREEN}━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━{Colors.ENDC}\n")
+
+def poll_match(match):
+    """Refresh one tracked match; runs on the update pool"""
+    try:
+        if not registry.tracks(match.url):
+            return  # removed while queued
+        print(f"{Colors.CYAN}[Auto-Update] Fetching latest scores for {match.id}...{Colors.ENDC}")
+        previous = snapshot_cache.peek(match.url)
+        data = snapshot_cache.refresh(match.url)
+        registry.observe(match, data, not_before=scraper.ready_at(match.url))
+        if data:
+            if data is not previous: print_match_update(data)
+            if not match.active:
+                print(f"{Colors.CYAN}[Auto-Update] {match.id} has ended, polling stopped{Colors.ENDC}")
+        else:
+            print(f"{Colors.FAIL}[Auto-Update] Failed to fetch scores for {match.id}{Colors.ENDC}")
+    finally:
+        match.polling = False
+
+def auto_update_scores():
+    """Poll every tracked match that is due, each on its own schedule.
+
+    Due matches are refreshed in parallel on the update pool, so one slow
+    upstream response does not hold up the rest of the tick.
+    """
+    if AUTO_UPDATE:
+        snapshot_cache.scheduled = registry.tracks
+    while True:
+        schedule_due_matches()
+        time.sleep(SCHEDULER_TICK)
+
+def schedule_due_matches():
+    registry.sync()
+    if AUTO_UPDATE:
+        now = time.monotonic()
+        for match in registry.due():
+            ready = scraper.ready_at(match.url)
+            if ready > now:
+                match.next_poll = ready + random.uniform(0, 1)  # host is rate limited: wait, don't burn a poll
+                continue
+            match.polling = True
+            update_pool.submit(poll_match, match)
+
+def run_shared_updater():
+    """Shared mode: elect one poller per host, every other worker mirrors the store.
+
+    The winner of POLLER_LOCK scrapes upstream and publishes snapshots to the
+    store. The others read from it, so adding workers adds request capacity
+    without adding upstream traffic. Losers keep trying the lock and take
+    over if the poller's process dies.
+    """
+    lock = PollerLock(POLLER_LOCK)
+    store_reader = StoreReader(snapshot_store)
+    snapshot_cache.fetch, snapshot_cache.ttl = store_reader, STORE_READ_TTL
+    registry.removal_listeners.append(store_reader.forget)
+    if AUTO_UPDATE:
+        # The poller refreshes tracked matches on its schedule and mirrors refresh them every tick
+        snapshot_cache.scheduled = registry.tracks
+    while True:
+        try:
+            if lock.held or lock.acquire():
+                if snapshot_cache.fetch is store_reader:
+                    print(f"{Colors.GREEN}[Auto-Update] Worker {os.getpid()} elected as the poller{Colors.ENDC}")
+                    snapshot_cache.fetch, snapshot_cache.ttl = scraper.scrape_crex_scores, CACHE_TTL
+                schedule_due_matches()
+            else:
+                # Pull new versions in so this worker's SSE subscribers hear about them
+                registry.sync()
+                for match in registry.all():
+                    snapshot_cache.refresh(match.url)
+        except Exception as e:
+            print(f"{Colors.FAIL}[Auto-Update] {e}{Colors.ENDC}")
+        time.sleep(SCHEDULER_TICK)
+
+if snapshot_store:
+    threading.Thread(target=run_shared_updater, daemon=True, name='shared-updater').start()
+
+def get_user_input():
+    print_banner()
+    url = ""
+    if len(sys.argv) > 1:
+        url = sys.argv[1]
+        print(f"\n{Colors.GREEN}✅ URL provided via command line.{Colors.ENDC}")
+    else:
+        url = input(f"\n{Colors.CYAN}Enter CREX match URL (or press Enter to set via web): {Colors.ENDC}").strip()
+    
+    if url:
+        print(f"{Colors.CYAN}📊 Fetching initial scores...{Colors.ENDC}")
+        match, data = track_match(url, default=True)
+        if data: print_match_update(data)
+    else:
+        print(f"\n{Colors.CYAN}📌 No URL provided. Set it via the web interface.{Colors.ENDC}")
+    print_server_info()
+
+def print_server_info():
+    print(f"\n{Colors.GREEN}{'='*60}{Colors.ENDC}")
+    print(f"{Colors.BOLD}🌐 Server is live at: http://localhost:5000{Colors.ENDC}")
+    print(f"  • View scoreboard at: {Colors.CYAN}http://localhost:5000/live{Colors.ENDC}")
+    for match in registry.all(): print(f"  • Tracking: {Colors.GREEN}{match.url}{Colors.ENDC}")
+    print(f"{Colors.GREEN}{'='*60}{Colors.ENDC}\n")
+
+if __name__ == '__main__':
+    try:
+        if not snapshot_store:
+            update_thread = threading.Thread(target=auto_update_scores, daemon=True)
+            update_thread.start()
+        get_user_input()
+        port = int(os.environ.get('PORT', 5000))
+        app.run(debug=False, host='0.0.0.0', port=port, use_reloader=False)
+    except KeyboardInterrupt:
+        print(f"\n\n{Colors.CYAN}Server stopped. Goodbye! 👋{Colors.ENDC}")
+        sys.exit(0)
@@ -0,0 +1,94 @@
+"""Check and time CricketScraper.parse_title_data against the legacy parser.
+
+Runs every title in fixtures/crex_titles.txt through both parsers, fails if
+any output differs, then reports titles per second for each.
+
+    python bench/bench_parser.py
+    python bench/bench_parser.py --seconds 5 --min-speedup 1.5
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from app import CricketScraper  # noqa: E402
+from legacy_parser import LegacyParser  # noqa: E402
+
+FIXTURES = os.path.join(HERE, 'fixtures', 'crex_titles.txt')
+START_TIME_TOLERANCE = 5  # seconds; startTimeUTC is relative to when each parser ran
+
+
+def load_titles(path=FIXTURES):
+    with open(path, encoding='utf-8') as f:
+        return [line.rstrip('\n') for line in f if line.strip() and not line.startswith('#')]
+
+
+def same_start_time(a, b):
+    if a is None or b is None:
+        return a == b
+    a, b = (datetime.fromisoformat(t.rstrip('Z')) for t in (a, b))
+    return abs((a - b).total_seconds()) <= START_TIME_TOLERANCE
+
+
+def compare(titles, new, old):
+    """Return a list of (title, field, new value, old value) for every mismatch"""
+    mismatches = []
+    for title in titles:
+        got, want = new.parse_title_data(title), old.parse_title_data(title)
+        for field in sorted(got.keys() | want.keys()):
+            if field == 'startTimeUTC' and same_start_time(got.get(field), want.get(field)):
+                continue
+            if got.get(field) != want.get(field):
+                mismatches.append((title, field, got.get(field), want.get(field)))
+    return mismatches
+
+
+def throughput(parser, titles, seconds):
+    parse = parser.parse_title_data
+    count, start = 0, time.perf_counter()
+    deadline = start + seconds
+    while True:
+        for title in titles:
+            parse(title)
+        count += len(titles)
+        now = time.perf_counter()
+        if now >= deadline:
+            return count / (now - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fixtures', default=FIXTURES, help='title corpus, one title per line')
+    parser.add_argument('--seconds', type=float, default=2.0, help='time spent timing each parser')
+    parser.add_argument('--min-speedup', type=float, default=None,
+                        help='fail if the new parser is not at least this many times faster')
+    args = parser.parse_args()
+
+    titles = load_titles(args.fixtures)
+    new, old = CricketScraper(), LegacyParser()
+
+    mismatches = compare(titles, new, old)
+    for title, field, got, want in mismatches:
+        print(f"MISMATCH {field}: new={got!r} legacy={want!r}\n    {title}")
+    print(f"{len(titles)} titles, {len(mismatches)} mismatching fields")
+
+    new_rate = throughput(new, titles, args.seconds)
+    old_rate = throughput(old, titles, args.seconds)
+    speedup = new_rate / old_rate
+    print(f"legacy parser: {old_rate:12,.0f} titles/s")
+    print(f"new parser:    {new_rate:12,.0f} titles/s  ({speedup:.2f}x)")
+
+    if mismatches:
+        return 1
+    if args.min_speedup is not None and speedup < args.min_speedup:
+        print(f"speedup {speedup:.2f}x is below the required {args.min_speedup:.2f}x")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
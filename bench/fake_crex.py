@@ -0,0 +1,171 @@
+"""A local stand-in for CREX that replays a recorded match.
+
+Serves the title from a replay file (seconds<TAB>title per line) at every
+path, advancing through the recording at --speed times real time. Pages are
+padded to --page-kb like the real site, answer If-None-Match with 304, and
+can rate limit with 429 + Retry-After. GET /__stats returns request counts.
+
+    python bench/fake_crex.py --speed 20 --start 900
+    python bench/fake_crex.py --port 8900 --rate-limit 2 --loop
+"""
+import argparse
+import hashlib
+import html
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+REPLAY = os.path.join(HERE, 'fixtures', 'replay_t20.txt')
+
+
+def load_replay(path=REPLAY):
+    """Return [(offset seconds, title)] sorted by offset"""
+    frames = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip() or line.startswith('#'):
+                continue
+            offset, title = line.rstrip('\n').split('\t', 1)
+            frames.append((float(offset), title))
+    return sorted(frames)
+
+
+class Replay:
+    """Maps wall-clock time onto a position in the recording"""
+
+    def __init__(self, frames, speed=1.0, loop=False, start=0.0):
+        self.frames = frames
+        self.speed = speed
+        self.loop = loop
+        self.start = start
+        self.started = time.monotonic()
+        self.length = frames[-1][0]
+
+    def position(self):
+        pos = self.start + (time.monotonic() - self.started) * self.speed
+        if self.loop and self.length:
+            pos %= self.length + 1
+        return pos
+
+    def title(self):
+        pos = self.position()
+        current = self.frames[0][1]
+        for offset, title in self.frames:
+            if offset > pos:
+                break
+            current = title
+        return current
+
+
+class FakeCrex(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, replay, page_kb=0, rate_limit=0, retry_after=5):
+        super().__init__(address, Handler)
+        self.replay = replay
+        self.padding = b'<!-- ' + b'x' * max(0, page_kb * 1024 - 10) + b' -->' if page_kb else b''
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.by_status = {}
+        self.window = (0, 0)  # (second, requests in it) for --rate-limit
+
+    def handle_error(self, request, client_address):
+        # The scraper hangs up once it has the title; that is expected, not worth a traceback
+        if not isinstance(sys.exc_info()[1], (ConnectionError, TimeoutError)):
+            super().handle_error(request, client_address)
+
+    def count(self, status):
+        with self.lock:
+            self.requests += 1
+            self.by_status[status] = self.by_status.get(status, 0) + 1
+
+    def over_limit(self):
+        if not self.rate_limit:
+            return False
+        second = int(time.monotonic())
+        with self.lock:
+            start, used = self.window
+            used = used + 1 if start == second else 1
+            self.window = (second, used)
+            return used > self.rate_limit
+
+    def stats(self):
+        with self.lock:
+            return {'requests': self.requests, 'by_status': dict(self.by_status),
+                    'position': round(self.replay.position(), 1), 'title': self.replay.title()}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        if self.path == '/__stats':
+            return self.send(200, json.dumps(server.stats()).encode(), 'application/json')
+        if server.over_limit():
+            server.count(429)
+            return self.send(429, b'', headers={'Retry-After': str(server.retry_after)})
+        title = server.replay.title()
+        etag = '"%s"' % hashlib.sha1(title.encode('utf-8')).hexdigest()[:16]
+        if self.headers.get('If-None-Match') == etag:
+            server.count(304)
+            return self.send(304, b'', headers={'ETag': etag})
+        server.count(200)
+        page = (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{html.escape(title)}</title>'
+                '</head><body>').encode('utf-8') + server.padding + b'</body></html>'
+        self.send(200, page, 'text/html; charset=utf-8', {'ETag': etag})
+
+    def send(self, status, body, content_type=None, headers=None):
+        self.send_response(status)
+        if content_type:
+            self.send_header('Content-Type', content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status != 304:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port=0, replay_path=REPLAY, speed=1.0, loop=False, start=0.0, page_kb=0, rate_limit=0, retry_after=5):
+    """Start a FakeCrex on a background thread and return it; server_address has the real port"""
+    server = FakeCrex(('127.0.0.1', port), Replay(load_replay(replay_path), speed, loop, start),
+                      page_kb, rate_limit, retry_after)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--replay', default=REPLAY, help='seconds<TAB>title file to replay')
+    parser.add_argument('--speed', type=float, default=1.0, help='recording seconds per real second')
+    parser.add_argument('--loop', action='store_true', help='start over after the last title')
+    parser.add_argument('--start', type=float, default=0, help='recording second to begin at')
+    parser.add_argument('--page-kb', type=int, default=200, help='pad pages to roughly this size')
+    parser.add_argument('--rate-limit', type=int, default=0, help='answer 429 above this many requests/second')
+    parser.add_argument('--retry-after', type=int, default=5, help='Retry-After seconds sent with 429')
+    args = parser.parse_args()
+
+    server = serve(args.port, args.replay, args.speed, args.loop, args.start,
+                   args.page_kb, args.rate_limit, args.retry_after)
+    print(f"Replaying {args.replay} at {args.speed}x on http://127.0.0.1:{server.server_address[1]}/")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
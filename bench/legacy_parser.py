@@ -0,0 +1,126 @@
+"""The title parser as it was before the single-pass rewrite.
+
+Kept verbatim (apart from being lifted out of CricketScraper) so that
+bench_parser.py can check the current parser still produces identical
+output. Do not "fix" anything in here.
+"""
+import re
+from datetime import datetime, timedelta
+
+
+class LegacyParser:
+    def parse_title_data(self, title_text):
+        """Parse the title text to extract match information and state"""
+        data = {
+            'matchState': 'UNKNOWN', 'title': title_text, 'shortTitle': '',
+            'result': '', 'startTimeUTC': None, 'update': 'Live',
+            'livescore': title_text.split(' | ')[0], 'runrate': 'CRR: 0.00',
+            'team1_name': 'Team 1', 'team1_score': '0', 'team1_wickets': '0', 'team1_overs': '0.0',
+            'team2_name': 'Team 2', 'team2_score': '0', 'team2_wickets': '0', 'team2_overs': '0.0',
+            'team2_status': 'Yet to bat',
+            'batterone': 'Batsman 1', 'batsmanonerun': '0', 'batsmanoneball': '(0)', 'batsmanonesr': '0.00',
+            'battertwo': 'Batsman 2', 'batsmantworun': '0', 'batsmantwoball': '(0)', 'batsmantwosr': '0.00'
+        }
+
+        score_part = title_text.split(' | ')[0]
+
+        if "won by" in score_part.lower() or "beat" in score_part.lower() or "match drawn" in score_part.lower():
+            data['matchState'] = 'ENDED'
+            data['result'] = score_part
+            try:
+                teams_part = title_text.split(' | ')[1]
+                vs_match = re.search(r'(.+?)\s+vs\s+(.+?),', teams_part)
+                if vs_match:
+                    data['team1_name'], data['team2_name'] = vs_match.group(1).strip(), vs_match.group(2).strip()
+                    data['shortTitle'] = f"{data['team1_name']} vs {data['team2_name']}"
+            except Exception: pass
+            return data
+
+        if "starts at" in score_part.lower() or re.search(r'in\s+\d+', score_part.lower()):
+            data['matchState'] = 'UPCOMING'
+            try:
+                teams_part = score_part.split(',')[0]
+                vs_match = re.search(r'(.+?)\s+vs\s+(.+)', teams_part)
+                if vs_match:
+                    data['team1_name'], data['team2_name'] = vs_match.group(1).strip(), vs_match.group(2).strip()
+                    data['shortTitle'] = f"{data['team1_name']} vs {data['team2_name']}"
+                time_match = re.search(r'in\s+(?:(\d+)h\s*)?(?:(\d+)m)?', score_part)
+                if time_match:
+                    hours, minutes = int(time_match.group(1) or 0), int(time_match.group(2) or 0)
+                    start_time = datetime.utcnow() + timedelta(hours=hours, minutes=minutes)
+                    data['startTimeUTC'] = start_time.isoformat() + "Z"
+            except Exception as e:
+                print(f"Error parsing upcoming match time: {e}")
+            return data
+
+        data['matchState'] = 'LIVE'
+        try:
+            if ' vs ' in score_part:
+                vs_index = score_part.find(' vs ')
+                team1_full, team2_full = score_part[:vs_index].strip(), score_part[vs_index + 4:].strip()
+
+                team1_name_match = re.match(r'^([^\d]+)', team1_full)
+                if team1_name_match: data['team1_name'] = team1_name_match.group(1).strip()
+
+                team2_name_match = re.match(r'^([^\d]+)', team2_full)
+                if team2_name_match: data['team2_name'] = team2_name_match.group(1).strip()
+
+                if team1_name_match and team2_name_match:
+                    data['shortTitle'] = f"{data['team1_name']} vs {data['team2_name']}"
+
+                score_match = re.search(r'(\d+)-(\d+)', team1_full)
+                if score_match: data['team1_score'], data['team1_wickets'] = score_match.groups()
+
+                overs_match = re.search(r'\((\d+\.\d+)\)', team1_full)
+                if overs_match: data['team1_overs'] = overs_match.group(1)
+
+                score_overs_match = re.search(r'\d+-\d+\s+\(\d+\.\d+\)', team1_full)
+                if score_overs_match:
+                    batsmen_part = team1_full[score_overs_match.end():].strip()
+                    if batsmen_part.startswith('(') and batsmen_part.endswith(')'):
+                        batsmen_str = batsmen_part[1:-1]
+                        batsmen_list = [b.strip() for b in batsmen_str.split(',')]
+                        for i, info in enumerate(batsmen_list[:2]):
+                            bat_match = re.match(r'^(.+?)\s+(\d+)\((\d+)\)$', info.strip())
+                            if bat_match:
+                                name, runs, balls = bat_match.groups()
+                                sr = f"{(int(runs) * 100 / int(balls)):.2f}" if int(balls) > 0 else "0.00"
+                                if i == 0:
+                                    data.update({'batterone': name.strip(), 'batsmanonerun': runs, 'batsmanoneball': f"({balls})", 'batsmanonesr': sr})
+                                else:
+                                    data.update({'battertwo': name.strip(), 'batsmantworun': runs, 'batsmantwoball': f"({balls})", 'batsmantwosr': sr})
+
+                score_match_t2 = re.search(r'(\d+)-(\d+)', team2_full)
+                if score_match_t2: data['team2_score'], data['team2_wickets'] = score_match_t2.groups()
+
+                overs_match_t2 = re.search(r'\(\(?(\d+(?:\.\d+)?)\)?\)', team2_full)
+                if overs_match_t2: data['team2_overs'] = overs_match_t2.group(1)
+
+                if data['team2_score'] != '0':
+                    data['team2_status'] = f"{data['team2_score']}-{data['team2_wickets']} ({data['team2_overs']} overs)"
+
+                try:
+                    t1_runs, t1_overs_dec = int(data['team1_score']), self.overs_to_decimal(data['team1_overs'])
+                    if t1_overs_dec > 0:
+                        data['runrate'] = f'CRR: {round(t1_runs / t1_overs_dec, 2)}'
+                        t2_runs = int(data['team2_score'])
+                        if t2_runs > 0:
+                            target = t2_runs + 1
+                            runs_needed = target - t1_runs
+                            overs_left_dec = self.overs_to_decimal(data['team2_overs']) - t1_overs_dec
+                            if overs_left_dec > 0 and runs_needed > 0:
+                                data['runrate'] += f' | RRR: {round(runs_needed / overs_left_dec, 2)}'
+                            data['update'] = f"Target: {target}"
+                except (ValueError, ZeroDivisionError): pass
+        except Exception as e:
+            print(f"Error parsing live title: {str(e)}")
+        return data
+
+    def overs_to_decimal(self, overs):
+        try:
+            if '.' in overs:
+                parts = overs.split('.')
+                return int(parts[0]) + (int(parts[1]) / 6)
+            return float(overs)
+        except:
+            return 0.0
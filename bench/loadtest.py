@@ -0,0 +1,367 @@
+"""Load-test app.py against a replayed match instead of the real CREX.
+
+By default starts fake_crex.py and the app under gunicorn (gevent workers, as
+on Render), tracks the replayed match, then opens --pollers clients that load
+/live and poll /api/current-score with If-None-Match like index.html's
+fallback, and --sse clients held open on /api/stream. Reports throughput,
+p50/p99 latency, SSE events delivered, upstream requests and server memory
+per open connection.
+
+    python bench/loadtest.py --pollers 2000 --sse 1000 --duration 30
+    python bench/loadtest.py --speed 60 --json results.json --max-p99-ms 250
+    python bench/loadtest.py --target http://127.0.0.1:5000 --server-pid 4242 --upstream http://127.0.0.1:8900
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from urllib.parse import urlparse
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, HERE)
+
+import fake_crex  # noqa: E402
+
+MATCH_PATH = '/scores/mi-vs-csk-match-14/live'
+FIRST_BALL = 900  # replay_t20.txt goes live here; earlier the scheduler rightly sleeps until the start
+READY_TIMEOUT = 30  # seconds to wait for gunicorn to answer
+SHUTDOWN_TIMEOUT = 3  # seconds gunicorn gets to close idle SSE streams before it is killed
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = {}  # name -> [seconds]
+        self.statuses = {}  # (name, status) -> count
+        self.errors = 0
+        self.events = {}  # SSE event type -> count
+
+    def record(self, name, status, seconds):
+        self.latencies.setdefault(name, []).append(seconds)
+        self.statuses[name, status] = self.statuses.get((name, status), 0) + 1
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Connection:
+    """Minimal keep-alive HTTP/1.1 client on asyncio streams; cheaper per socket than any library"""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+            self.writer = None
+
+    async def send(self, method, path, headers=None, body=b''):
+        lines = [f'{method} {path} HTTP/1.1', f'Host: {self.host}:{self.port}']
+        lines += [f'{name}: {value}' for name, value in (headers or {}).items() if value is not None]
+        if body:
+            lines.append(f'Content-Length: {len(body)}')
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+        await self.writer.drain()
+
+    async def read_head(self):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('server closed the connection')
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                return status, headers
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+    async def read_body(self, status, headers):
+        if status in (204, 304) or 100 <= status < 200:
+            return b''
+        if 'content-length' in headers:
+            return await self.reader.readexactly(int(headers['content-length']))
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = bytearray()
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                if not size:
+                    await self.reader.readline()
+                    return bytes(body)
+                body += await self.reader.readexactly(size)
+                await self.reader.readline()
+        body = await self.reader.read()
+        self.close()
+        return body
+
+    async def request(self, method, path, headers=None, body=b''):
+        reused = self.writer is not None
+        if not reused:
+            await self.open()
+        try:
+            await self.send(method, path, headers, body)
+            status, response_headers = await self.read_head()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            if not reused:
+                raise
+            # The server timed out the idle keep-alive socket; reconnect like a browser would
+            self.close()
+            await self.open()
+            await self.send(method, path, headers, body)
+            status, response_headers = await self.read_head()
+        content = await self.read_body(status, response_headers)
+        if response_headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, response_headers, content
+
+
+async def poller(host, port, stats, interval, deadline):
+    """One /live viewer on the polling fallback: load the page, then poll the score every interval"""
+    conn = Connection(host, port)
+    etag = None
+    try:
+        started = time.perf_counter()
+        status, _, _ = await conn.request('GET', '/live', {'Accept-Encoding': 'gzip'})
+        stats.record('/live', status, time.perf_counter() - started)
+        await asyncio.sleep(random.uniform(0, interval))
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            status, headers, _ = await conn.request('GET', '/api/current-score',
+                                                    {'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+            stats.record('/api/current-score', status, time.perf_counter() - started)
+            etag = headers.get('etag', etag)
+            await asyncio.sleep(min(interval, max(0.0, deadline - time.monotonic())))
+    except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+        stats.errors += 1
+    finally:
+        conn.close()
+
+
+async def sse_client(host, port, stats, deadline):
+    """One EventSource on /api/stream, held open until the deadline, counting events by type"""
+    conn = Connection(host, port)
+    try:
+        started = time.perf_counter()
+        await conn.open()
+        await conn.send('GET', '/api/stream', {'Accept': 'text/event-stream'})
+        status, _ = await conn.read_head()
+        stats.record('/api/stream', status, time.perf_counter() - started)
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                line = await asyncio.wait_for(conn.reader.readline(), remaining)
+            except asyncio.TimeoutError:
+                return
+            if not line:
+                raise ConnectionError('stream closed')
+            if line.startswith(b'event:'):
+                kind = line[6:].strip().decode('latin-1')
+                stats.events[kind] = stats.events.get(kind, 0) + 1
+    except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+        stats.errors += 1
+    finally:
+        conn.close()
+
+
+def process_tree_rss_kb(pid):
+    """Resident memory of pid and all of its descendants, from /proc"""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children.setdefault(ppid, []).append(int(entry))
+    total, todo = 0, [pid]
+    while todo:
+        current = todo.pop()
+        todo += children.get(current, [])
+        try:
+            with open(f'/proc/{current}/status') as f:
+                total += next(int(line.split()[1]) for line in f if line.startswith('VmRSS:'))
+        except (OSError, StopIteration):
+            pass
+    return total
+
+
+def rss_kb(pids):
+    return sum(process_tree_rss_kb(pid) for pid in pids) if pids else None
+
+
+def upstream_requests(upstream):
+    if not upstream:
+        return None
+    with urllib.request.urlopen(upstream.rstrip('/') + '/__stats', timeout=5) as response:
+        return json.load(response)['requests']
+
+
+def raise_fd_limit(needed):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    want = hard if hard != resource.RLIM_INFINITY else max(soft, needed)
+    if soft < want:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (want, hard))
+    if want < needed:
+        print(f"warning: open file limit {want} is below the {needed} sockets this run needs")
+
+
+def start_server(port, workers, connections, upstream, workdir):
+    """Run app.py under gunicorn with its own snapshot and history databases"""
+    env = dict(os.environ, PYTHONUNBUFFERED='1',
+               SNAPSHOT_STORE=os.path.join(workdir, 'snapshots.db'),
+               HISTORY_DB=os.path.join(workdir, 'history.db'))
+    log = open(os.path.join(workdir, 'server.log'), 'wb')
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'app:app', '--worker-class', 'gevent',
+         '--worker-connections', str(connections), '--workers', str(workers),
+         '--bind', f'127.0.0.1:{port}', '--graceful-timeout', str(SHUTDOWN_TIMEOUT)],
+        cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    base = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + READY_TIMEOUT
+    while True:
+        if server.poll() is not None:
+            raise SystemExit(f"gunicorn exited with {server.returncode}; see {log.name}")
+        try:
+            urllib.request.urlopen(base + '/metrics', timeout=2).close()
+            break
+        except OSError:
+            if time.monotonic() > deadline:
+                server.terminate()
+                raise SystemExit(f"gunicorn did not answer within {READY_TIMEOUT}s; see {log.name}")
+            time.sleep(0.2)
+    request = urllib.request.Request(base + '/api/set-url', method='POST',
+                                     data=json.dumps({'url': upstream + MATCH_PATH}).encode(),
+                                     headers={'Content-Type': 'application/json'})
+    urllib.request.urlopen(request, timeout=30).close()
+    return server
+
+
+async def run_load(target, args, pids):
+    parsed = urlparse(target)
+    host, port = parsed.hostname, parsed.port or 80
+    stats = Stats()
+    total = args.pollers + args.sse
+    kinds = ['poll'] * args.pollers + ['sse'] * args.sse
+    random.shuffle(kinds)
+
+    rss_before = rss_kb(pids)
+    upstream_before = upstream_requests(args.upstream)
+    started = time.monotonic()
+    deadline = started + args.ramp + args.duration
+    tasks = []
+    for i, kind in enumerate(kinds):
+        if kind == 'poll':
+            tasks.append(asyncio.ensure_future(poller(host, port, stats, args.poll_interval, deadline)))
+        else:
+            tasks.append(asyncio.ensure_future(sse_client(host, port, stats, deadline)))
+        if args.ramp:
+            await asyncio.sleep(max(0.0, started + args.ramp * (i + 1) / total - time.monotonic()))
+    await asyncio.sleep(min(1.0, max(0.0, deadline - time.monotonic())))
+    rss_loaded = rss_kb(pids)
+    await asyncio.gather(*tasks)
+    elapsed = time.monotonic() - started
+
+    upstream_after = upstream_requests(args.upstream)
+    polls = stats.latencies.get('/api/current-score', [])
+    result = {
+        'pollers': args.pollers, 'sse_clients': args.sse, 'duration': round(elapsed, 1),
+        'requests': sum(len(v) for v in stats.latencies.values()),
+        'score_requests_per_second': round(len(polls) / max(args.duration, 1e-9), 1),
+        'errors': stats.errors,
+        'statuses': {f'{name} {status}': count for (name, status), count in sorted(stats.statuses.items())},
+        'latency_ms': {name: {'p50': round(percentile(v, 50) * 1000, 2), 'p99': round(percentile(v, 99) * 1000, 2),
+                              'max': round(max(v) * 1000, 2), 'count': len(v)}
+                       for name, v in sorted(stats.latencies.items())},
+        'sse_events': stats.events,
+        'upstream_requests': None if upstream_before is None else upstream_after - upstream_before,
+        'server_rss_mb': None if rss_loaded is None else round(rss_loaded / 1024, 1),
+        'rss_kb_per_connection': None if rss_before is None else round((rss_loaded - rss_before) / max(total, 1), 1),
+    }
+    return result
+
+
+def report(result):
+    print(f"\n{result['pollers']} pollers + {result['sse_clients']} SSE clients for {result['duration']}s")
+    print(f"  score polls/s         {result['score_requests_per_second']}")
+    print(f"  requests              {result['requests']} ({result['errors']} client errors)")
+    for name, lat in result['latency_ms'].items():
+        print(f"  {name:<22}p50 {lat['p50']:>8.2f} ms   p99 {lat['p99']:>8.2f} ms   max {lat['max']:>8.2f} ms   n={lat['count']}")
+    for key, count in result['statuses'].items():
+        print(f"  status {key:<30}{count}")
+    print(f"  SSE events            {result['sse_events'] or 'none'}")
+    print(f"  upstream requests     {result['upstream_requests'] if result['upstream_requests'] is not None else 'n/a'}")
+    if result['rss_kb_per_connection'] is not None:
+        print(f"  server RSS            {result['server_rss_mb']} MB, {result['rss_kb_per_connection']} KB per connection")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pollers', type=int, default=1000, help='clients polling /api/current-score')
+    parser.add_argument('--sse', type=int, default=1000, help='clients holding /api/stream open')
+    parser.add_argument('--duration', type=float, default=30, help='seconds of steady load after the ramp')
+    parser.add_argument('--ramp', type=float, default=5, help='seconds over which clients connect')
+    parser.add_argument('--poll-interval', type=float, default=15, help="seconds between a poller's requests")
+    parser.add_argument('--target', help='test an already running app instead of starting one')
+    parser.add_argument('--server-pid', type=int, action='append', default=[],
+                        help='with --target: pid whose process tree RSS to measure (repeatable)')
+    parser.add_argument('--upstream', help='with --target: fake_crex base URL to count upstream requests on')
+    parser.add_argument('--port', type=int, default=5055, help='port for the app this script starts')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers for the app this script starts')
+    parser.add_argument('--speed', type=float, default=30, help='replay speed of the fake upstream')
+    parser.add_argument('--json', help='also write the results here, to compare across releases')
+    parser.add_argument('--max-p99-ms', type=float, help='exit 1 if /api/current-score p99 exceeds this')
+    args = parser.parse_args()
+
+    raise_fd_limit(args.pollers + args.sse + 256)
+    server = fake = None
+    pids = args.server_pid
+    target = args.target
+    workdir = tempfile.mkdtemp(prefix='loadtest-')
+    try:
+        if not target:
+            fake = fake_crex.serve(speed=args.speed, loop=True, start=FIRST_BALL, page_kb=200)
+            args.upstream = f'http://127.0.0.1:{fake.server_address[1]}'
+            server = start_server(args.port, args.workers, args.pollers + args.sse + 100, args.upstream, workdir)
+            pids = [server.pid]
+            target = f'http://127.0.0.1:{args.port}'
+        result = asyncio.run(run_load(target, args, pids))
+    finally:
+        if server:
+            server.terminate()
+            try:
+                server.wait(SHUTDOWN_TIMEOUT + 5)
+            except subprocess.TimeoutExpired:
+                server.kill()
+        if fake:
+            fake.shutdown()
+
+    report(result)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+    p99 = result['latency_ms'].get('/api/current-score', {}).get('p99')
+    if args.max_p99_ms is not None and (p99 is None or p99 > args.max_p99_ms):
+        print(f"FAIL: /api/current-score p99 {p99} ms exceeds {args.max_p99_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,306 @@
+"""Behaviour checks for paths the benchmarks don't exercise.
+
+Each check_* function runs app.py code against local stand-ins (no CREX
+traffic) and raises AssertionError when the behaviour regresses.
+
+    python bench/smoke.py
+    python bench/smoke.py check_fallback_pages
+"""
+import gzip
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from bs4 import BeautifulSoup
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+import app  # noqa: E402
+
+PAGES = os.path.join(HERE, 'fixtures', 'pages')
+
+
+class PageServer(ThreadingHTTPServer):
+    """Serves a dict of path -> body bytes with Content-Length, plus any per-path headers"""
+    daemon_threads = True
+
+    def __init__(self, pages, headers=None):
+        super().__init__(('127.0.0.1', 0), PageHandler)
+        self.pages = pages
+        self.headers = headers or {}
+        self.hits = 0
+        self.connections = 0
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def url(self, path):
+        return f'http://127.0.0.1:{self.server_address[1]}{path}'
+
+    def handle_error(self, request, client_address):
+        # The scraper hangs up on long bodies once it has the title
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def do_GET(self):
+        self.server.hits += 1
+        body = self.server.pages.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in self.server.headers.get(self.path, {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def load_pages():
+    pages = {}
+    for name in sorted(os.listdir(PAGES)):
+        with open(os.path.join(PAGES, name), 'rb') as f:
+            pages[name] = f.read()
+    return pages
+
+
+def baseline_title(page):
+    """What the pre-streaming scraper made of a page: BeautifulSoup over the whole body"""
+    title = BeautifulSoup(page.decode('utf-8'), 'html.parser').find('title')
+    return title.text.strip() if title else ""
+
+
+def check_fallback_pages():
+    """Every fixture page, short or padded past STREAM_MAX_BYTES, yields the baseline title"""
+    padding = b'<!-- ' + b'x' * app.STREAM_MAX_BYTES + b' -->'
+    pages = {}
+    for name, page in load_pages().items():
+        pages['/' + name] = page
+        pages['/padded/' + name] = padding + page
+    server = PageServer(pages)
+    try:
+        scraper = app.CricketScraper()
+        for path, page in pages.items():
+            data = scraper.scrape_crex_scores(server.url(path))
+            assert data is not None, f"{path}: scrape failed"
+            want = baseline_title(page)
+            assert data['title'] == want, f"{path}: title {data['title']!r}, baseline {want!r}"
+    finally:
+        server.shutdown()
+
+
+def check_drained_connections_are_reused():
+    """Compressed bodies are drained by wire bytes and pooled; long ones are dropped and counted"""
+    title = b'<html><head><title>IND 4-0 (0.1) vs AUS | CREX</title></head><body>'
+    # The title comes after more decoded bytes than the whole compressed body, which still has KBs to go
+    compressed = gzip.compress(b'<!-- ' + b'x' * 200 * 1024 + b' -->' + title + os.urandom(16 * 1024).hex().encode())
+    assert len(compressed) < app.STREAM_DRAIN_LIMIT
+    server = PageServer({'/gzip': compressed, '/long': title + b'x' * app.STREAM_MAX_BYTES},
+                        {'/gzip': {'Content-Encoding': 'gzip'}})
+    try:
+        scraper = app.CricketScraper()
+        dropped = app.CONNECTIONS_DROPPED.value()
+        for _ in range(3):
+            assert scraper.scrape_crex_scores(server.url('/gzip')) is not None
+            scraper._last.clear()
+            scraper._validators.clear()
+        assert server.connections == 1, f"{server.connections} connections for 3 short compressed pages"
+        assert app.CONNECTIONS_DROPPED.value() == dropped
+        assert scraper.scrape_crex_scores(server.url('/long')) is not None
+        assert app.CONNECTIONS_DROPPED.value() == dropped + 1, "long body closed unread but not counted"
+    finally:
+        server.shutdown()
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.05)
+
+
+def check_expired_blocks_free_their_host():
+    """A host whose Retry-After block has passed is ready now and, once refilled, gets pruned"""
+    scraper = app.CricketScraper()
+    now = time.monotonic()
+    with scraper._host_lock:
+        scraper._budget('blocked.example', now).blocked_until = now + 1
+        assert scraper._budgets['blocked.example'].ready_at(now) == now + 1
+        assert scraper._budgets['blocked.example'].ready_at(now + 2) == 0.0
+        scraper._budget('other.example', now + 2)
+    assert sorted(scraper._budgets) == ['other.example'], sorted(scraper._budgets)
+
+
+def check_history_innings():
+    """Rows without an over position sit in innings 0; the side that bats first is innings 1, whatever the fixture order"""
+    titles = [
+        'MI vs CSK, Match 14, starts in 15m | Mumbai Indians vs Chennai Super Kings | CREX',
+        'CSK 0-0 (0.0) vs MI | Mumbai Indians vs Chennai Super Kings, Match 14 Live Score | CREX',
+        'CSK 5-1 (0.3) (Ruturaj Gaikwad 1(1)) vs MI | Mumbai Indians vs Chennai Super Kings, Match 14 Live Score | CREX',
+        'MI vs CSK 180-6 (20.0) | Mumbai Indians vs Chennai Super Kings, Match 14 Live Score | CREX',
+        'MI 4-0 (0.1) (Rohit Sharma 4(1), Ishan Kishan 0(0)) vs CSK 180-6 (20.0) | Mumbai Indians vs Chennai Super Kings, Match 14 Live Score | CREX',
+        'Mumbai Indians won by 4 wickets | Mumbai Indians vs Chennai Super Kings, Match 14 | CREX',
+    ]
+    store = app.HistoryStore(os.path.join(tempfile.mkdtemp(prefix='smoke-'), 'history.db'))
+    scraper = app.CricketScraper()
+    for version, title in enumerate(titles, 1):
+        store.record('m', dict(scraper.parse_title_data(title), version=version))
+    wait_for(lambda: store._query('SELECT COUNT(*) FROM history', ())[0][0] == len(titles))
+    rows = store._query('SELECT seq, innings, balls FROM history ORDER BY seq', ())
+    # The scoreless innings-break title and the result have no over position
+    assert [innings for _, innings, _ in rows] == [0, 1, 1, 0, 2, 0], rows
+    assert store.innings('m') == 2
+    assert [p['seq'] for p in store.query('m', 1)] == [1, 2]
+    assert [p['seq'] for p in store.query('m', 2, 0, 0)] == [], "a row without overs counted as ball 0"
+    assert [p['seq'] for p in store.query('m', 2)] == [4]
+
+
+def check_history_records_every_version():
+    """History is off unless HISTORY_DB is set; when on, every new version of a tracked match is kept"""
+    if not os.environ.get('HISTORY_DB'):
+        assert app.history is None, "importing app.py opened a history database"
+    live = b'<html><head><title>IND 4-0 (0.1) (Rohit Sharma 4(1), Shubman Gill 0(0)) vs AUS | CREX</title></head></html>'
+    pages = {'/match': live.replace(b'4-0 (0.1)', b'0-0 (0.0)'), '/other': live}
+    server = PageServer(pages)
+    store = app.HistoryStore(os.path.join(tempfile.mkdtemp(prefix='smoke-'), 'history.db'))
+    saved, app.history = app.history, store
+    app.snapshot_cache.listeners.append(app.record_history)
+    try:
+        match, _ = app.track_match(server.url('/match'))  # first snapshot, fetched outside the poller
+        pages['/match'] = live
+        app.snapshot_cache.refresh(match.url)  # a version picked up between polls
+        app.snapshot_cache.refresh(server.url('/other'))  # not tracked
+        wait_for(lambda: store._query('SELECT COUNT(*) FROM history', ())[0][0] >= 2)
+        time.sleep(app.HISTORY_FLUSH_INTERVAL + 0.2)
+        rows = store._query('SELECT match_id, balls FROM history ORDER BY seq', ())
+        assert rows == [(match.id, 0), (match.id, 1)], rows
+    finally:
+        app.snapshot_cache.listeners.remove(app.record_history)
+        app.history = saved
+        app.registry.remove(app.match_id_for(server.url('/match')))
+        server.shutdown()
+
+
+def check_scheduler_polls_due_match():
+    """A due match is submitted to the update pool once its host already has a rate budget"""
+    server = PageServer({'/due': b'<html><head><title>IND 4-0 (0.1) vs AUS | CREX</title></head></html>'})
+    match = None
+    try:
+        match, data = app.track_match(server.url('/due'))  # spends from, and so creates, the host budget
+        assert data is not None
+        hits = server.hits
+        for _ in range(3):
+            match.next_poll = 0.0
+            app.schedule_due_matches()
+            wait_for(lambda: not match.polling)
+        assert server.hits == hits + 3, f"{server.hits - hits} polls for 3 due ticks"
+    finally:
+        if match: app.registry.remove(match.id)
+        server.shutdown()
+
+
+def check_scheduled_reads_stay_off_upstream():
+    """Once the scheduler owns a match, expired reads serve what it published instead of refetching"""
+    server = PageServer({'/upcoming': b'<html><head><title>MI vs CSK, starts in 5h | CREX</title></head></html>',
+                         '/untracked': b'<html><head><title>IND 4-0 (0.1) vs AUS | CREX</title></head></html>'})
+    cache = app.snapshot_cache
+    saved, cache.scheduled = cache.scheduled, app.registry.tracks
+    match = None
+    try:
+        match, _ = app.track_match(server.url('/upcoming'))
+        assert match.next_poll - time.monotonic() > 3600, "upcoming match scheduled too soon"
+        cache.get(server.url('/untracked'))
+        hits = server.hits
+        for url in (match.url, server.url('/untracked')):
+            cache._entries[url].fetched_at -= cache.ttl + 1
+        for _ in range(5):
+            cache.get(match.url)
+        assert server.hits == hits, f"{server.hits - hits} upstream fetches for a scheduled match"
+        cache.get(server.url('/untracked'))
+        assert server.hits == hits + 1, "untracked URL did not refresh after its TTL"
+    finally:
+        cache.scheduled = saved
+        if match: app.registry.remove(match.id)
+        server.shutdown()
+
+
+def check_removed_and_untracked_urls_leave_nothing_behind():
+    """Removing a match frees its cache, scraper and SSE state; /api/scrape of an untracked URL keeps none"""
+    page = b'<html><head><title>IND 4-0 (0.1) vs AUS | CREX</title></head></html>'
+    server = PageServer({'/tracked': page, '/adhoc': page})
+    client = app.app.test_client()
+    tracked, adhoc = server.url('/tracked'), server.url('/adhoc')
+
+    def kept(url):
+        return [name for name, table in (('cache', app.snapshot_cache._entries), ('last', app.scraper._last),
+                                         ('validators', app.scraper._validators), ('channels', app.broadcaster._channels))
+                if url in table]
+    try:
+        response = client.post('/api/matches', json={'url': tracked})
+        assert response.status_code == 201, response.status_code
+        match_id = response.get_json()['match']['id']
+        assert client.get(f'/api/matches/{match_id}/score').status_code == 200
+        assert 'cache' in kept(tracked) and 'channels' in kept(tracked), kept(tracked)
+        assert client.delete(f'/api/matches/{match_id}').status_code == 200
+        assert kept(tracked) == [], f"left behind after DELETE: {kept(tracked)}"
+
+        assert client.get('/api/scrape', query_string={'url': adhoc}).status_code == 200
+        assert kept(adhoc) == [], f"left behind after /api/scrape: {kept(adhoc)}"
+    finally:
+        server.shutdown()
+
+
+def check_waiting_stream_follows_new_default():
+    """A stream opened before any match is set picks up the default as soon as another worker sets it"""
+    store = app.SnapshotStore(os.path.join(tempfile.mkdtemp(prefix='smoke-'), 'store.db'))
+    setter, mirror = app.MatchRegistry(store), app.MatchRegistry(store)
+    broadcaster = app.ScoreBroadcaster()
+    mirror.default_listeners.append(broadcaster.wake_all)
+    messages = []
+
+    def follow():
+        for message in broadcaster.subscribe(lambda: (default := mirror.default) and default.url):
+            messages.append(message)
+            if message.startswith(b'event: snapshot'):
+                return
+    threading.Thread(target=follow, daemon=True).start()
+    wait_for(lambda: any(m.startswith(b'event: waiting') for m in messages))
+    started = time.monotonic()
+    match = setter.add('https://crex.com/scoreboard/X/Y/live', default=True)
+    mirror.sync(force=True)
+    broadcaster.publish(match.url, {'title': 'IND 4-0 (0.1) vs AUS', 'version': 1})
+    wait_for(lambda: messages[-1].startswith(b'event: snapshot'), timeout=app.STREAM_KEEPALIVE / 3)
+    assert time.monotonic() - started < 1, "waiting stream slept through the new default"
+
+
+def main(names):
+    checks = {name: fn for name, fn in globals().items() if name.startswith('check_')}
+    failed = 0
+    for name in names or checks:
+        try:
+            checks[name]()
+            print(f"ok    {name}")
+        except AssertionError as e:
+            failed += 1
+            print(f"FAIL  {name}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))